@@ -42,31 +42,37 @@ class Array:
 
     def __getitem__(self, index):
         """
-        Gets the contents of the index element.
+        Gets the contents of the index element, or the list of the elements selected by a slice.
 
         Args:
-            index (int): The index of the element to get.
+            index (int or slice): The index of the element to get, or a slice of the elements.
 
         Returns:
-            The element at the specified index.
+            The element at the specified index, or a list of the elements of the slice.
 
         Raises:
             AssertionError: If index is out of range.
         """
+        if type(index) is slice:
+            return self._elements[ index ]
         assert index >= 0 and index < len(self), "Array subscript out of range"
         return self._elements[ index ]
 
     def __setitem__(self, index, value):
         """
-        Puts the value in the array element at index position.
+        Puts the value in the array element at index position, or the values of a sequence in the elements selected by a slice.
 
         Args:
-            index (int): The index where the value should be placed.
-            value: The value to place in the array.
+            index (int or slice): The index where the value should be placed, or a slice of the elements.
+            value: The value to place in the array, or a sequence with one value per element of the slice.
 
         Raises:
             AssertionError: If index is out of range.
+            ValueError: If the sequence does not have one value per element of the slice.
         """
+        if type(index) is slice:
+            self._elements[ index ] = value
+            return
         assert index >= 0 and index < len(self), "Array subscript out of range"
         self._elements[ index ] = value
 
@@ -77,8 +83,7 @@ class Array:
         Args:
             value: The value to set each element to.
         """
-        for i in range( len(self) ) :
-            self._elements[i] = value
+        self._elements[:] = [value] * len(self)
 
     def __iter__(self):
         """
@@ -1,5 +1,11 @@
-# Program for playing the game of Life.
+# Program for playing the game of Life. An RLE or plaintext pattern file may be given on the command line in place of INIT_CONFIG.
+import sys
+
 from LifeGrid import LifeGrid
+from LifePatterns import loadPattern
+from LifeRule import LifeRule, CONWAY
+from LifeHistory import CycleDetector
+from LifeRender import FrameRenderer, renderGrid
 
 # Define the initial configuration of live cells.
 INIT_CONFIG = [ (0,0), (1,1), (1,2), (2,0), (2,1) ]
@@ -8,24 +14,54 @@ INIT_CONFIG = [ (0,0), (1,1), (1,2), (2,0), (2,1) ]
 GRID_WIDTH = 10
 GRID_HEIGHT = 10
 
+# Select what lies beyond the edges of the grid: LifeGrid.DEAD_BORDER, LifeGrid.TOROIDAL or LifeGrid.MIRRORED.
+GRID_BOUNDARY = LifeGrid.DEAD_BORDER
+
 # Indicate the number of generations.
 NUM_GENS = 20
 
+# Render every Nth generation; 0 renders only the final generation.
+RENDER_EVERY = 1
+
 def main():
     # Construct the game grid and configure it.
-    grid = LifeGrid( GRID_WIDTH, GRID_HEIGHT )
-    grid.configure( INIT_CONFIG )
+    grid = LifeGrid( GRID_WIDTH, GRID_HEIGHT, GRID_BOUNDARY )
+    rule = CONWAY
+    if len( sys.argv ) > 1 :
+        notation = loadPattern( sys.argv[1], grid )
+        if notation is not None :
+            rule = LifeRule( notation )
+    else :
+        grid.configure( INIT_CONFIG )
+
+    # Remember the generations played so the game can stop once the grid settles.
+    detector = CycleDetector()
+    detector.record( grid.stateHash() )
 
     # Play the game.
-    draw( grid )
-    for i in range( NUM_GENS ):
-        evolve( grid )
-        draw( grid )
+    renderer = FrameRenderer( every = RENDER_EVERY )
+    renderer.draw( grid, 0 )
+    for gen in range( 1, NUM_GENS + 1 ):
+        evolve( grid, rule )
+        drawn = renderer.draw( grid, gen, final = (gen == NUM_GENS) )
+        if detector.record( grid.stateHash() ) :
+            print( "Generation %d repeats with period %d." % (detector.firstRepeat(), detector.period()) )
+            if skipToEnd( grid, rule, detector, NUM_GENS - gen ) > 0 or not drawn :
+                renderer.draw( grid, NUM_GENS, final = True )
+            break
+
+# Plays only the generations that are not part of a whole period of the detected cycle. Returns the number of generations played.
+def skipToEnd( grid, rule, detector, numGens ):
+    remaining = detector.remaining( numGens )
+    for i in range( remaining ):
+        evolve( grid, rule )
+    return remaining
 
-# Generates the next generation of organisms.
-def evolve( grid ):
+# Generates the next generation of organisms using the given Life-like rule.
+def evolve( grid, rule = CONWAY ):
     # List for storing the live cells of the next generation.
     liveCells = list()
+    table = rule.table()
 
     # Iterate over the elements of the grid.
     for i in range( grid.numRows() ) :
@@ -34,7 +70,7 @@ def evolve( grid ):
             neighbors = grid.numLiveNeighbors( i, j )
 
             # Add the (i,j) tuple to liveCells if this cell contains a live organism in the next generation.
-            if (grid.isLiveCell( i, j ) and neighbors == 2) or (neighbors == 3 ) :
+            if table[grid.isLiveCell( i, j ) * 9 + neighbors] :
                 liveCells.append( (i, j) )
 
     # Reconfigure the grid using the liveCells coord list.
@@ -42,15 +78,9 @@ def evolve( grid ):
 
 # Prints a text-based representation of the game grid.
 def draw( grid ):
-    for i in range(grid.numRows()):
-        row = ""
-        for j in range(grid.numCols()):
-            if grid.isLiveCell(i, j):
-                row += "@ "
-            else:
-                row += ". "
-        print(row.strip())
+    print( renderGrid( grid ) )
     print()
 
 # Executes the main routine.
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
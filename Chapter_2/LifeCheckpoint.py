@@ -0,0 +1,101 @@
+# Long game of Life runs are checkpointed so they can be resumed after the process dies. The Checkpointer ADT saves a snapshot of a grid
+# every N generations. Only a copy of the live cells is taken in the evolve loop; encoding and writing the snapshot file happen on a
+# background thread. Works with any grid providing captureState() and writeSnapshot(), such as LifeGrid and SparseLifeGrid.
+
+# Checkpointer( grid, path, every ): Creates a checkpointer saving the grid to the file at path every N generations.
+
+# update( generation ): Called once per generation. Takes a copy of the grid and queues it for writing when the generation is due.
+
+# close(): Waits until the last queued snapshot has been written and stops the background thread.
+
+# replaceFile( path, data ): Writes the bytes to the file at path, replacing it atomically. Used by the grids to write their snapshots.
+
+import os
+import queue
+import threading
+
+# Writes the data to the file at path, replacing it atomically.
+def replaceFile( path, data ):
+    # Write to a temporary file first so an interrupted write never replaces a good snapshot.
+    tmpPath = path + '.tmp'
+    with open( tmpPath, 'wb' ) as stream :
+        stream.write( data )
+    os.replace( tmpPath, path )
+
+class Checkpointer :
+    """
+    Writes snapshots of a life grid from a background thread.
+
+    The queue holds at most one pending snapshot. When the writer falls behind, the pending snapshot is replaced by
+    the newer one, so the evolve loop never waits on the disk.
+    """
+    # Creates the checkpointer and starts the writer thread.
+    def __init__( self, grid, path, every ):
+        """
+        Creates the checkpointer and starts the writer thread.
+
+        :param grid: the grid to checkpoint.
+        :param path: the snapshot file, replaced by every checkpoint.
+        :param every: the number of generations between two checkpoints (min=1).
+        """
+        assert every > 0, "The checkpoint interval must be > 0."
+        self._grid = grid
+        self._path = path
+        self._every = every
+        self._pending = queue.Queue( maxsize = 1 )
+        self._error = None
+        self._thread = threading.Thread( target = self._run, daemon = True )
+        self._thread.start()
+
+    # Queues a checkpoint of the grid if the generation is due.
+    def update( self, generation ):
+        """
+        Queues a checkpoint of the grid if the generation is due.
+
+        :param generation: the generation number of the grid.
+        :return: True if a checkpoint was queued, False otherwise.
+        """
+        if self._error is not None :
+            raise self._error
+        if generation % self._every != 0 :
+            return False
+        item = (self._grid.captureState(), generation)
+        try :
+            self._pending.put_nowait( item )
+        except queue.Full :
+            # Drop the snapshot still waiting; the newer one supersedes it.
+            try :
+                self._pending.get_nowait()
+            except queue.Empty :
+                pass
+            self._pending.put_nowait( item )
+        return True
+
+    # Writes the last queued checkpoint and stops the writer thread.
+    def close( self ):
+        """
+        Writes the last queued checkpoint and stops the writer thread.
+        """
+        # The sentinel is only queued while the writer can still take it, so a dead writer never blocks the close.
+        while self._thread.is_alive() :
+            try :
+                self._pending.put( None, timeout = 0.1 )
+                break
+            except queue.Full :
+                pass
+        self._thread.join()
+        if self._error is not None :
+            raise self._error
+
+    # The writer thread: writes each queued snapshot until the None sentinel is received.
+    def _run( self ):
+        while True :
+            item = self._pending.get()
+            if item is None :
+                return
+            state, generation = item
+            try :
+                self._grid.writeSnapshot( state, self._path, generation )
+            except Exception as error :
+                # Kept for the evolve loop to raise; the writer goes on taking snapshots so the queue never fills up.
+                self._error = error
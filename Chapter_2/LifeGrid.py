@@ -1,7 +1,9 @@
 # A life grid is used to represent and store the area in the game of Life that contains organisms. The grid contains a rectangular grouping of cells
 # of a finite size divided into rows and columns. The individual cells, which can be alive or dead, are referenced by row and column indices, both of which start at zero.
 
-# LifeGrid( nrows, ncols ): Creates a new game grid consisting of nrows and ncols. All cells in the grid are set to dead.
+# LifeGrid( nrows, ncols, boundary ): Creates a new game grid consisting of nrows and ncols. All cells in the grid are set to dead. The boundary mode
+# selects what lies beyond the edges of the grid: dead cells (LifeGrid.DEAD_BORDER, the default), the cells of the opposite edge (LifeGrid.TOROIDAL)
+# or a mirror image of the edge cells (LifeGrid.MIRRORED).
 
 # numRows(): Returns the number rows in the grid.
 
@@ -18,10 +20,33 @@
 # range of the grid.
 
 # numLiveNeighbors( row, col ): Returns the number of live neighbors for the given cell (row, col). The neighbors of a cell include all of the cells immediately
-# surrounding it in all directions. For the cells along the border of the grid, the neighbors that fall outside the grid are assumed to be dead. The cell indices
-# must be within the valid range of the grid.
+# surrounding it in all directions. For the cells along the border of the grid, the neighbors that fall outside the grid are resolved by the boundary mode.
+# The cell indices must be within the valid range of the grid.
+
+# boundary(): Returns the boundary mode of the grid.
+
+# liveColumns( row ): Returns the sorted list of the column indices of the live cells in the given row.
+
+# stateHash(): Returns a hash of the set of live cells. The hash is maintained incrementally by setCell() and clearCell(), so two grids holding the same
+# live cells have the same hash.
+
+# snapshot( path, generation ): Saves the cells and the generation number to the file at path as raw bit rows, one bit per cell. The file is replaced
+# atomically.
+
+# restore( path ): Configures the grid from the snapshot file at path and returns the generation number stored in it. The snapshot must have been taken
+# from a grid of the same size.
+
+# captureState() / writeSnapshot( state, path, generation ): Split snapshot() in two, so the live cells can be copied between two generations while the
+# encoding and writing happen elsewhere, as done by the background checkpointer.
+
+import struct
 
 from Array2DADT import Array2D
+from LifeCheckpoint import replaceFile
+
+# The snapshot header: magic, generation number, number of rows and number of columns.
+_SNAPSHOT_HEADER = struct.Struct( '<4sQII' )
+_SNAPSHOT_MAGIC = b'LGR1'
 
 class LifeGrid :
     """
@@ -31,16 +56,29 @@ class LifeGrid :
     DEAD_CELL = 0
     LIVE_CELL = 1
 
+    # Defines constants to represent the boundary modes.
+    DEAD_BORDER = 'dead'
+    TOROIDAL = 'toroidal'
+    MIRRORED = 'mirrored'
+
     # Creates the game grid and initializes the cells to dead.
-    def __init__( self, numRows, numCols ):
+    def __init__( self, numRows, numCols, boundary = DEAD_BORDER ):
         """
         Creates the game grid and initializes the cells to dead.
 
         :param numRows: the number of rows.
         :param numCols: the number of columns.
+        :param boundary: the boundary mode (LifeGrid.DEAD_BORDER, LifeGrid.TOROIDAL or LifeGrid.MIRRORED).
         """
+        assert boundary in (LifeGrid.DEAD_BORDER, LifeGrid.TOROIDAL, LifeGrid.MIRRORED), "Invalid boundary mode."
         # Allocate the 2-D array for the grid.
         self._grid = Array2D( numRows, numCols )
+        self._boundary = boundary
+        # The neighbor row and column indices of every row and column, with the boundary mode already applied.
+        self._rowNeighbors = _neighborTable( numRows, boundary )
+        self._colNeighbors = _neighborTable( numCols, boundary )
+        # The Zobrist-style hash of the live cells.
+        self._hash = 0
         # Clear the grid and set all cells to dead.
         self.configure( list() )
 
@@ -62,6 +100,15 @@ class LifeGrid :
         """
         return self._grid.numCols()
 
+    # Returns the boundary mode of the grid.
+    def boundary( self ):
+        """
+        Returns the boundary mode of the grid.
+
+        :return: LifeGrid.DEAD_BORDER, LifeGrid.TOROIDAL or LifeGrid.MIRRORED.
+        """
+        return self._boundary
+
     # Configures the grid to contain the given live cells.
     def configure( self, coordList ):
         """
@@ -99,6 +146,8 @@ class LifeGrid :
         :param row: the row of the cell.
         :param col: the column of the cell.
         """
+        if self._grid[row, col] == LifeGrid.LIVE_CELL :
+            self._hash ^= cellKey( row, col )
         self._grid[row, col] = LifeGrid.DEAD_CELL
 
     # Sets the indicated cell to be alive.
@@ -109,8 +158,98 @@ class LifeGrid :
         :param row: the row of the cell.
         :param col: the column of the cell.
         """
+        if self._grid[row, col] != LifeGrid.LIVE_CELL :
+            self._hash ^= cellKey( row, col )
         self._grid[row, col] = LifeGrid.LIVE_CELL
 
+    # Returns the columns of the live cells in the given row.
+    def liveColumns( self, row ):
+        """
+        Returns the columns of the live cells in the given row.
+
+        :param row: the row to scan.
+        :return: the sorted list of column indices.
+        """
+        grid = self._grid
+        return [col for col in range( self.numCols() ) if grid[row, col] == LifeGrid.LIVE_CELL]
+
+    # Returns the hash of the set of live cells.
+    def stateHash( self ):
+        """
+        Returns the hash of the set of live cells.
+
+        :return: the XOR of the keys of all live cells.
+        """
+        return self._hash
+
+    # Saves the cells of the grid to a snapshot file.
+    def snapshot( self, path, generation = 0 ):
+        """
+        Saves the cells of the grid to a snapshot file.
+
+        :param path: the file to write.
+        :param generation: the generation number stored with the cells.
+        """
+        LifeGrid.writeSnapshot( self.captureState(), path, generation )
+
+    # Configures the grid from a snapshot file.
+    def restore( self, path ):
+        """
+        Configures the grid from a snapshot file.
+
+        :param path: the file to read.
+        :return: the generation number stored in the snapshot.
+        """
+        with open( path, 'rb' ) as stream :
+            data = stream.read()
+        magic, generation, numRows, numCols = _SNAPSHOT_HEADER.unpack_from( data )
+        assert magic == _SNAPSHOT_MAGIC, "Not a LifeGrid snapshot."
+        assert numRows == self.numRows() and numCols == self.numCols(), "Snapshot taken from a grid of another size."
+
+        self.configure( list() )
+        rowBytes = (numCols + 7) // 8
+        pos = _SNAPSHOT_HEADER.size
+        for row in range( numRows ):
+            for byteNdx in range( rowBytes ):
+                bits = data[pos + byteNdx]
+                while bits :
+                    # Isolate the lowest set bit and turn it into a column index.
+                    low = bits & -bits
+                    self.setCell( row, byteNdx * 8 + low.bit_length() - 1 )
+                    bits ^= low
+            pos += rowBytes
+        return generation
+
+    # Returns a copy of the live cells to be passed to writeSnapshot().
+    def captureState( self ):
+        """
+        Returns a copy of the live cells to be passed to writeSnapshot().
+
+        :return: a tuple (numRows, numCols, rows) where rows holds the live columns of each row.
+        """
+        return (self.numRows(), self.numCols(), tuple( tuple( self.liveColumns( row ) ) for row in range( self.numRows() ) ))
+
+    # Packs the cells captured by captureState() into bit rows and writes them to a snapshot file.
+    @staticmethod
+    def writeSnapshot( state, path, generation = 0 ):
+        """
+        Packs the cells captured by captureState() into bit rows and writes them to a snapshot file.
+
+        :param state: the value returned by captureState().
+        :param path: the file to write.
+        :param generation: the generation number stored with the cells.
+        """
+        numRows, numCols, rows = state
+        rowBytes = (numCols + 7) // 8
+        data = bytearray( _SNAPSHOT_HEADER.pack( _SNAPSHOT_MAGIC, generation, numRows, numCols ) )
+        data.extend( bytes( rowBytes * numRows ) )
+        pos = _SNAPSHOT_HEADER.size
+        for cols in rows :
+            for col in cols :
+                data[pos + (col >> 3)] |= 1 << (col & 7)
+            pos += rowBytes
+        replaceFile( path, data )
+
     # Returns the number of live neighbors for the given cell.
     def numLiveNeighbors( self, row, col ):
         """
@@ -120,11 +259,44 @@ class LifeGrid :
         :param col: the column of the cell.
         :return: the number of live neighbors.
         """
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+        # The cell states are 0 and 1, so the live neighbors are the sum of the 3x3 block less the cell itself.
+        # The neighbor tables never hold an index outside the grid, so no bounds are checked here.
+        grid = self._grid
+        cols = self._colNeighbors[col]
         count = 0
-        for direction in directions:
-            newRow, newCol = row + direction[0], col + direction[1]
-            if newRow >= 0 and newRow < self.numRows() and newCol >= 0 and newCol < self.numCols():
-                if self._grid[newRow, newCol] == LifeGrid.LIVE_CELL:
-                    count += 1
-        return count
\ No newline at end of file
+        for r in self._rowNeighbors[row] :
+            for c in cols :
+                count += grid[r, c]
+        return count - grid[row, col]
+
+# Returns the 64-bit Zobrist key of cell (row, col), shared by every grid backend. The row and then the column are mixed in with the
+# splitmix64 finalizer, so neighboring cells get unrelated keys. The built-in tuple hash cannot be used: hash( -1 ) == hash( -2 ), so
+# the cells of rows or columns -1 and -2 would cancel out.
+def cellKey( row, col ):
+    return _splitMix64( _splitMix64( row ) + col )
+
+def _splitMix64( value ):
+    z = (value + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+_MASK64 = (1 << 64) - 1
+
+# Builds the table of neighbor indices for each index 0..size-1 along one dimension. Indices beyond an edge are dropped
+# for a dead border, wrapped around for a torus and reflected back onto the edge cell for a mirrored border.
+def _neighborTable( size, boundary ):
+    table = list()
+    for ndx in range( size ):
+        neighbors = list()
+        for n in (ndx - 1, ndx, ndx + 1) :
+            if n < 0 or n >= size :
+                if boundary == LifeGrid.DEAD_BORDER :
+                    continue
+                elif boundary == LifeGrid.TOROIDAL :
+                    n %= size
+                else :
+                    n = 0 if n < 0 else size - 1
+            neighbors.append( n )
+        table.append( tuple( neighbors ) )
+    return table
@@ -0,0 +1,91 @@
+# Long runs of the game of Life usually settle into still lifes or oscillators long before the requested number of generations has been played.
+# The Cycle Detector ADT keeps a bounded history of the state hashes produced by a life grid and reports when a configuration repeats.
+
+# CycleDetector( maxHistory ): Creates a new detector that remembers the hashes of at most maxHistory generations. Cycles with a period larger
+# than maxHistory are not detected.
+
+# record( stateHash ): Records the hash of the next generation. Returns True if the same configuration was seen before, False otherwise.
+
+# period(): Returns the period of the detected cycle, or None if no cycle has been detected yet. A still life has a period of 1.
+
+# firstRepeat(): Returns the generation number at which the repeated configuration was first recorded again, or None.
+
+# remaining( numGens ): Returns the number of generations that still have to be played to reach the configuration of numGens generations
+# from now, given that the grid is in the cycle.
+
+from collections import deque
+
+class CycleDetector:
+    """
+    Detects repeating configurations of a life grid from its incremental state hash.
+
+    The grids maintain a Zobrist-style hash of their live set, the XOR of the well-mixed 64-bit keys of the live
+    cells, so comparing hashes is O(1) per generation. Two different configurations sharing a hash is possible
+    but unlikely enough to be ignored here.
+    """
+    def __init__(self, maxHistory = 1024):
+        """
+        Creates a new detector with an empty history.
+
+        :param maxHistory: the number of generations remembered (min=1).
+        """
+        assert maxHistory > 0, "The history must hold at least one generation."
+        self._maxHistory = maxHistory
+        self._seen = dict()
+        self._order = deque()
+        self._generation = -1
+        self._period = None
+        self._firstRepeat = None
+
+    # Records the hash of the next generation.
+    def record( self, stateHash ):
+        """
+        Records the hash of the next generation.
+
+        :param stateHash: the state hash of the grid for this generation.
+        :return: True if the configuration was seen before, False otherwise.
+        """
+        self._generation += 1
+        previous = self._seen.get( stateHash )
+        if previous is not None :
+            if self._period is None :
+                self._period = self._generation - previous
+                self._firstRepeat = self._generation
+            return True
+
+        # Forget the oldest generation once the history is full.
+        if len( self._order ) == self._maxHistory :
+            del self._seen[self._order.popleft()]
+        self._seen[stateHash] = self._generation
+        self._order.append( stateHash )
+        return False
+
+    # Returns the period of the detected cycle.
+    def period( self ):
+        """
+        Returns the period of the detected cycle.
+
+        :return: the period, or None if no cycle has been detected.
+        """
+        return self._period
+
+    # Returns the generation at which the configuration first repeated.
+    def firstRepeat( self ):
+        """
+        Returns the generation at which the configuration first repeated.
+
+        :return: the generation number, or None if no cycle has been detected.
+        """
+        return self._firstRepeat
+
+    # Returns the number of generations left to play once inside the cycle.
+    def remaining( self, numGens ):
+        """
+        Returns the number of generations that have to be played to reach the same configuration as
+        playing numGens more generations, skipping every whole period.
+
+        :param numGens: the number of generations still requested.
+        :return: the reduced number of generations.
+        """
+        assert self._period is not None, "No cycle has been detected."
+        return numGens % self._period
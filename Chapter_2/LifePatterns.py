@@ -0,0 +1,163 @@
+# Patterns for the game of Life are usually distributed in the run length encoded (RLE) format or in the plaintext (.cells) format. The
+# functions below read and write both formats for any life grid providing configure(), setCell() and isLiveCell(). Grids with an infinite
+# extent must also provide minRange() and maxRange(), fixed-size grids numRows() and numCols().
+
+# loadPattern( path, grid, row, col ): Reads the pattern stored in the file at path into the grid, with the top-left corner of the pattern
+# placed at (row, col). The format is chosen from the file extension: .rle for RLE, anything else for plaintext. Returns the rule named in
+# the file, or None.
+
+# savePattern( grid, path ): Writes the live cells of the grid to the file at path, in the format chosen from the file extension.
+
+# readRLE( stream, grid, row, col ) / readPlaintext( stream, grid, row, col ): Read a pattern line by line from an open text stream. Cells
+# are set as they are decoded, so no list of coordinates is ever built.
+
+# writeRLE( grid, stream, rule ) / writePlaintext( grid, stream ): Write the grid to an open text stream one row at a time.
+
+# The maximum length of an RLE output line, as recommended by the format.
+RLE_LINE_LENGTH = 70
+
+# Loads a pattern file into the grid.
+def loadPattern( path, grid, row = 0, col = 0 ):
+    with open( path ) as stream :
+        if path.lower().endswith( '.rle' ) :
+            return readRLE( stream, grid, row, col )
+        else :
+            return readPlaintext( stream, grid, row, col )
+
+# Saves the grid to a pattern file.
+def savePattern( grid, path, rule = 'B3/S23' ):
+    with open( path, 'w' ) as stream :
+        if path.lower().endswith( '.rle' ) :
+            writeRLE( grid, stream, rule )
+        else :
+            writePlaintext( grid, stream )
+
+# Reads an RLE pattern from the stream into the grid.
+def readRLE( stream, grid, row = 0, col = 0 ):
+    grid.configure( list() )
+    rule = None
+    curRow = row
+    curCol = col
+    count = 0
+    for line in stream :
+        line = line.strip()
+        if not line or line[0] == '#' :
+            continue
+
+        # The header line gives the pattern size and, optionally, the rule.
+        if line[0] == 'x' :
+            for field in line.split( ',' ) :
+                name, _, value = field.partition( '=' )
+                if name.strip() == 'rule' :
+                    rule = value.strip()
+            continue
+
+        for ch in line :
+            if ch.isdigit() :
+                count = count * 10 + int( ch )
+                continue
+            run = count if count > 0 else 1
+            count = 0
+            if ch == 'b' or ch == '.' :
+                curCol += run
+            elif ch == '$' :
+                curRow += run
+                curCol = col
+            elif ch == '!' :
+                return rule
+            elif ch.isalpha() :
+                # Every state other than the dead state is treated as alive.
+                for i in range( run ):
+                    grid.setCell( curRow, curCol + i )
+                curCol += run
+    return rule
+
+# Reads a plaintext pattern from the stream into the grid.
+def readPlaintext( stream, grid, row = 0, col = 0 ):
+    grid.configure( list() )
+    curRow = row
+    for line in stream :
+        line = line.rstrip( '\r\n' )
+        if line.startswith( '!' ) :
+            continue
+        for i, ch in enumerate( line ):
+            if ch == 'O' or ch == '*' :
+                grid.setCell( curRow, col + i )
+        curRow += 1
+    return None
+
+# Writes the grid to the stream in the RLE format.
+def writeRLE( grid, stream, rule = 'B3/S23' ):
+    minRow, minCol, maxRow, maxCol = gridBounds( grid )
+    if minRow is None :
+        stream.write( "x = 0, y = 0, rule = %s\n!\n" % rule )
+        return
+    stream.write( "x = %d, y = %d, rule = %s\n" % (maxCol - minCol + 1, maxRow - minRow + 1, rule) )
+
+    line = _RLELine( stream )
+    pendingRows = 0
+    for r in range( minRow, maxRow + 1 ):
+        runTag = None
+        runLength = 0
+        for c in range( minCol, maxCol + 1 ):
+            tag = 'o' if grid.isLiveCell( r, c ) else 'b'
+            if tag == runTag :
+                runLength += 1
+                continue
+            if runTag is not None :
+                # The row has content, so the pending row ends are written first.
+                if pendingRows > 0 :
+                    line.add( pendingRows, '$' )
+                    pendingRows = 0
+                line.add( runLength, runTag )
+            runTag = tag
+            runLength = 1
+
+        # Trailing dead cells of a row are implied by the end of row marker.
+        if runTag == 'o' :
+            if pendingRows > 0 :
+                line.add( pendingRows, '$' )
+                pendingRows = 0
+            line.add( runLength, runTag )
+        if r < maxRow :
+            pendingRows += 1
+    line.add( 1, '!' )
+    line.flush()
+
+# Writes the grid to the stream in the plaintext format.
+def writePlaintext( grid, stream ):
+    minRow, minCol, maxRow, maxCol = gridBounds( grid )
+    if minRow is None :
+        return
+    for r in range( minRow, maxRow + 1 ):
+        stream.write( ''.join( 'O' if grid.isLiveCell( r, c ) else '.' for c in range( minCol, maxCol + 1 ) ) )
+        stream.write( '\n' )
+
+# Returns the (minRow, minCol, maxRow, maxCol) bounds of the grid area holding live cells, or all Nones for an empty infinite grid.
+def gridBounds( grid ):
+    if hasattr( grid, 'minRange' ) :
+        minRow, minCol = grid.minRange()
+        maxRow, maxCol = grid.maxRange()
+        return minRow, minCol, maxRow, maxCol
+    return 0, 0, grid.numRows() - 1, grid.numCols() - 1
+
+# Accumulates RLE tokens into output lines of at most RLE_LINE_LENGTH characters.
+class _RLELine :
+    def __init__( self, stream ):
+        self._stream = stream
+        self._parts = list()
+        self._length = 0
+
+    def add( self, count, tag ):
+        token = tag if count == 1 else "%d%s" % (count, tag)
+        if self._length + len( token ) > RLE_LINE_LENGTH :
+            self.flush()
+        self._parts.append( token )
+        self._length += len( token )
+
+    def flush( self ):
+        if self._parts :
+            self._stream.write( ''.join( self._parts ) )
+            self._stream.write( '\n' )
+            self._parts = list()
+            self._length = 0
@@ -0,0 +1,67 @@
+# Text rendering of the game of Life grids. Each frame is built in a single bytearray from the live columns of each row, rather than by
+# concatenating strings cell by cell, and is written to the output stream with one call. Works with any grid providing liveColumns() and
+# either minRange()/maxRange() or numRows()/numCols().
+
+# renderGrid( grid, live, dead ): Returns the text representation of the grid, one line per row with the cells separated by spaces.
+
+# FrameRenderer( stream, every, live, dead ): Creates a renderer that writes every Nth generation to the stream. An every value of 0 renders
+# only the frames explicitly marked as final, which suits headless runs.
+
+import sys
+
+from LifePatterns import gridBounds
+
+# Returns the text frame for the grid.
+def renderGrid( grid, live = '@', dead = '.' ):
+    minRow, minCol, maxRow, maxCol = gridBounds( grid )
+    if minRow is None :
+        return ''
+
+    # Each cell takes two characters, its state and a separator; the last separator of a row becomes the newline.
+    blankRow = ((dead + ' ') * (maxCol - minCol + 1))[:-1] + '\n'
+    blankRow = blankRow.encode( 'ascii' )
+    rowLength = len( blankRow )
+    liveByte = ord( live )
+
+    frame = bytearray( blankRow * (maxRow - minRow + 1) )
+    start = -2 * minCol
+    for row in range( minRow, maxRow + 1 ):
+        for col in grid.liveColumns( row ):
+            frame[start + 2 * col] = liveByte
+        start += rowLength
+    return frame[:-1].decode( 'ascii' )
+
+class FrameRenderer :
+    """
+    Writes the frames of a game of Life run, throttled to every Nth generation.
+    """
+    # Creates the renderer.
+    def __init__( self, stream = None, every = 1, live = '@', dead = '.' ):
+        """
+        Creates the renderer.
+
+        :param stream: the text stream the frames are written to (default: standard output).
+        :param every: render a frame every this many generations; 0 renders the final frames only.
+        :param live: the character used for live cells.
+        :param dead: the character used for dead cells.
+        """
+        assert every >= 0, "The frame interval must be >= 0."
+        self._stream = stream if stream is not None else sys.stdout
+        self._every = every
+        self._live = live
+        self._dead = dead
+
+    # Renders the grid for the given generation if it is due.
+    def draw( self, grid, generation, final = False ):
+        """
+        Renders the grid for the given generation if it is due.
+
+        :param grid: the grid to render.
+        :param generation: the generation number of the grid.
+        :param final: True to render the frame regardless of the interval.
+        :return: True if the frame was written, False if it was skipped.
+        """
+        if not final and (self._every == 0 or generation % self._every != 0) :
+            return False
+        self._stream.write( renderGrid( grid, self._live, self._dead ) + '\n\n' )
+        return True
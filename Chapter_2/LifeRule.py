@@ -0,0 +1,96 @@
+# The game of Life belongs to a family of "Life-like" cellular automata that only differ in the numbers of live neighbors for which a dead
+# cell is born and a live cell survives. These rules are written in B/S notation: Conway's rule is B3/S23, HighLife is B36/S23 and
+# Day & Night is B3678/S34678.
+
+# LifeRule( notation ): Creates a rule from its B/S notation. The older S/B notation ("23/3") is also accepted.
+
+# nextState( isAlive, neighbors ): Returns True if a cell in the given state with the given number of live neighbors is alive in the next
+# generation.
+
+# table(): Returns the 18-entry lookup table of the rule. The entry at index isAlive * 9 + neighbors is 1 if the cell is alive in the next
+# generation and 0 otherwise, so the evolve loops evaluate the rule with a single lookup per cell.
+
+# birthOnZero(): Returns True if dead cells with no live neighbors are born, which an infinite grid cannot represent.
+
+# The number of possible live neighbor counts, 0 through 8.
+NUM_COUNTS = 9
+
+class LifeRule :
+    """
+    Implements a Life-like rule compiled into a lookup table.
+    """
+    # Creates the rule from its notation.
+    def __init__( self, notation = 'B3/S23' ):
+        """
+        Creates the rule from its notation.
+
+        :param notation: the rule in B/S notation, such as 'B36/S23', or in S/B notation, such as '23/36'.
+        """
+        born, survive = _parse( notation )
+        self._notation = 'B%s/S%s' % (''.join( str( n ) for n in born ), ''.join( str( n ) for n in survive ))
+
+        # Entries 0-8 are used for dead cells and entries 9-17 for live cells.
+        self._table = [0] * (2 * NUM_COUNTS)
+        for n in born :
+            self._table[n] = 1
+        for n in survive :
+            self._table[NUM_COUNTS + n] = 1
+
+    # Returns the state of a cell in the next generation.
+    def nextState( self, isAlive, neighbors ):
+        """
+        Returns the state of a cell in the next generation.
+
+        :param isAlive: True if the cell is currently alive.
+        :param neighbors: the number of live neighbors of the cell.
+        :return: True if the cell is alive in the next generation, False otherwise.
+        """
+        return self._table[isAlive * NUM_COUNTS + neighbors] == 1
+
+    # Returns the lookup table used by the evolve loops.
+    def table( self ):
+        """
+        Returns the lookup table of the rule, indexed by isAlive * 9 + neighbors.
+
+        :return: the list of 18 next states.
+        """
+        return self._table
+
+    # Does the rule give birth to cells with no live neighbors?
+    def birthOnZero( self ):
+        """
+        Does the rule give birth to cells with no live neighbors?
+
+        :return: True if B0 is part of the rule, False otherwise.
+        """
+        return self._table[0] == 1
+
+    def __str__( self ):
+        return self._notation
+
+    def __repr__( self ):
+        return "LifeRule('%s')" % self._notation
+
+# Parses the notation into the sorted lists of birth and survival counts.
+def _parse( notation ):
+    parts = notation.strip().upper().split( '/' )
+    assert len( parts ) == 2, "Invalid rule notation."
+    if parts[0].startswith( 'B' ) or parts[1].startswith( 'S' ) :
+        born, survive = parts
+    else :
+        # The S/B notation lists the survival counts first.
+        survive, born = parts
+    return _counts( born.lstrip( 'B' ) ), _counts( survive.lstrip( 'S' ) )
+
+# Converts a string of digits into a sorted list of distinct neighbor counts.
+def _counts( digits ):
+    counts = set()
+    for ch in digits :
+        assert ch.isdigit() and int( ch ) < NUM_COUNTS, "Invalid neighbor count in rule."
+        counts.add( int( ch ) )
+    return sorted( counts )
+
+# The rules most often used.
+CONWAY = LifeRule( 'B3/S23' )
+HIGHLIFE = LifeRule( 'B36/S23' )
+DAY_AND_NIGHT = LifeRule( 'B3678/S34678' )
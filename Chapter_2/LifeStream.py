@@ -0,0 +1,197 @@
+# Visualizers and analytics tools follow a game of Life run as it is played. The Life Stream ADT plays the game in the background and
+# publishes each generation to any number of asyncio subscribers as a delta: the cells born and the cells that died. A subscriber that
+# falls behind never stalls the game. Once its buffer is full, the newer deltas are merged into the last buffered one, so the subscriber
+# skips frames but can still rebuild the exact grid from the deltas it receives.
+
+# LifeStream( grid, evolve, rule, numGens, bufferSize ): Creates a stream playing numGens generations (None plays forever) of the grid
+# with the given evolve function and rule. Each subscriber buffers at most bufferSize deltas.
+
+# subscribe(): Returns an async iterator of (generation, (births, deaths)) pairs. The first pair holds every live cell as a birth. The
+# iterator's skipped() method returns the number of generations merged into others because the subscriber was behind.
+
+# run(): Coroutine playing the game and publishing the generations until numGens is reached or stop() is called.
+
+# stop(): Stops the game after the current generation.
+
+# simulate( grid, evolve, rule, numGens ): Async generator for the single subscriber case:
+#     async for gen, (births, deaths) in simulate( grid, evolve, rule ): ...
+
+import asyncio
+from collections import deque
+
+from LifePatterns import gridBounds
+
+class LifeStream :
+    """
+    Plays a game of Life and publishes the generations to asyncio subscribers.
+    """
+    # Creates the stream.
+    def __init__( self, grid, evolve, rule = None, numGens = None, bufferSize = 1 ):
+        """
+        Creates the stream.
+
+        :param grid: the grid to play, already configured.
+        :param evolve: the function computing the next generation, called as evolve( grid, rule ).
+        :param rule: the rule passed to evolve, or None to use the default rule of evolve.
+        :param numGens: the number of generations to play, or None to play until stop() is called.
+        :param bufferSize: the number of deltas each subscriber buffers before frames are merged (min=1).
+        """
+        assert bufferSize > 0, "The buffer must hold at least one delta."
+        self._grid = grid
+        self._evolve = evolve
+        self._rule = rule
+        self._numGens = numGens
+        self._bufferSize = bufferSize
+        self._generation = 0
+        self._liveCells = _liveSet( grid )
+        self._subscribers = list()
+        self._stopped = False
+
+    # Returns a new subscription to the generations.
+    def subscribe( self ):
+        """
+        Returns a new subscription to the generations.
+
+        :return: an async iterator of (generation, (births, deaths)) pairs.
+        """
+        subscription = _Subscription( self._bufferSize )
+        subscription.publish( self._generation, self._liveCells, () )
+        if self._stopped :
+            subscription.close()
+        self._subscribers.append( subscription )
+        return subscription
+
+    # Plays the game and publishes the generations.
+    async def run( self ):
+        """
+        Plays the game and publishes the generations. The evolve function runs in a worker thread, so the event loop
+        keeps serving the subscribers while a generation is computed.
+        """
+        try :
+            while not self._stopped and (self._numGens is None or self._generation < self._numGens) :
+                births, deaths = await asyncio.to_thread( self._step )
+                self._generation += 1
+                for subscription in self._subscribers :
+                    subscription.publish( self._generation, births, deaths )
+        finally :
+            self._stopped = True
+            for subscription in self._subscribers :
+                subscription.close()
+
+    # Stops the game after the current generation.
+    def stop( self ):
+        """
+        Stops the game after the current generation.
+        """
+        self._stopped = True
+
+    # Evolves the grid by one generation and returns the (births, deaths) delta.
+    def _step( self ):
+        if self._rule is None :
+            self._evolve( self._grid )
+        else :
+            self._evolve( self._grid, self._rule )
+        liveCells = _liveSet( self._grid )
+        births = tuple( sorted( liveCells - self._liveCells ) )
+        deaths = tuple( sorted( self._liveCells - liveCells ) )
+        self._liveCells = liveCells
+        return births, deaths
+
+# Plays the game for a single subscriber.
+async def simulate( grid, evolve, rule = None, numGens = None, bufferSize = 1 ):
+    stream = LifeStream( grid, evolve, rule, numGens, bufferSize )
+    subscription = stream.subscribe()
+    producer = asyncio.ensure_future( stream.run() )
+    try :
+        async for item in subscription :
+            yield item
+    finally :
+        stream.stop()
+        await producer
+
+# Returns the set of (row, col) coordinates of the live cells of the grid.
+def _liveSet( grid ):
+    minRow, minCol, maxRow, maxCol = gridBounds( grid )
+    cells = set()
+    if minRow is not None :
+        for row in range( minRow, maxRow + 1 ):
+            cells.update( (row, col) for col in grid.liveColumns( row ) )
+    return cells
+
+# A subscriber's buffer of deltas.
+class _Subscription :
+    def __init__( self, bufferSize ):
+        self._bufferSize = bufferSize
+        self._buffer = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._skipped = 0
+
+    # Returns the number of generations merged into others because the subscriber was behind.
+    def skipped( self ):
+        return self._skipped
+
+    def publish( self, generation, births, deaths ):
+        if len( self._buffer ) < self._bufferSize :
+            self._buffer.append( [generation, set( births ), set( deaths )] )
+        else :
+            # Merge into the last buffered delta: a cell born then dead, or dead then born, is unchanged.
+            entry = self._buffer[-1]
+            entry[0] = generation
+            pendingBirths, pendingDeaths = entry[1], entry[2]
+            for cell in births :
+                if cell in pendingDeaths :
+                    pendingDeaths.discard( cell )
+                else :
+                    pendingBirths.add( cell )
+            for cell in deaths :
+                if cell in pendingBirths :
+                    pendingBirths.discard( cell )
+                else :
+                    pendingDeaths.add( cell )
+            self._skipped += 1
+        self._ready.set()
+
+    def close( self ):
+        self._closed = True
+        self._ready.set()
+
+    def __aiter__( self ):
+        return self
+
+    async def __anext__( self ):
+        while not self._buffer :
+            if self._closed :
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        generation, births, deaths = self._buffer.popleft()
+        return generation, (tuple( sorted( births ) ), tuple( sorted( deaths ) ))
+
+if __name__ == '__main__':
+    from GameOfLife import evolve
+    from LifeGrid import LifeGrid
+
+    async def follow( name, subscription, delay ):
+        # Rebuilds the grid from the deltas, sleeping between frames to simulate a slow consumer.
+        cells = set()
+        frames = 0
+        async for gen, (births, deaths) in subscription :
+            cells.update( births )
+            cells.difference_update( deaths )
+            frames += 1
+            await asyncio.sleep( delay )
+        print( "%s: %d frames, %d skipped, %d live cells at generation %d" % (name, frames, subscription.skipped(), len( cells ), gen) )
+
+    async def demo():
+        grid = LifeGrid( 20, 20 )
+        grid.configure( [(1, 2), (2, 3), (3, 1), (3, 2), (3, 3)] )
+        stream = LifeStream( grid, evolve, numGens = 30 )
+        await asyncio.gather( stream.run(), follow( "fast", stream.subscribe(), 0 ), follow( "slow", stream.subscribe(), 0.05 ) )
+
+        # The single subscriber helper.
+        grid.configure( [(1, 2), (2, 3), (3, 1), (3, 2), (3, 3)] )
+        async for gen, (births, deaths) in simulate( grid, evolve, numGens = 4 ):
+            print( "generation %d: %d births, %d deaths" % (gen, len( births ), len( deaths )) )
+
+    asyncio.run( demo() )
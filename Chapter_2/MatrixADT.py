@@ -53,13 +53,20 @@ class Matrix:
     def __setitem__(self, ndxTuple, scalar):
         self._theGrid[ndxTuple[0], ndxTuple[1]] = scalar
 
+    # Another matrix type that implements the reflected operator (e.g. SparseMatrix) chooses how a mixed expression is computed.
     def __add__(self, rhsMatrix):
+        if not isinstance(rhsMatrix, Matrix) and hasattr(rhsMatrix, '__radd__'):
+            return NotImplemented
         return self.add(rhsMatrix)
     
     def __sub__(self, rhsMatrix):
+        if not isinstance(rhsMatrix, Matrix) and hasattr(rhsMatrix, '__rsub__'):
+            return NotImplemented
         return self.subtract(rhsMatrix)
 
     def __mul__(self, rhsMatrix):
+        if not isinstance(rhsMatrix, Matrix) and hasattr(rhsMatrix, '__rmul__'):
+            return NotImplemented
         return self.multiply(rhsMatrix)
     
     def __rmul__(self, scalar):
@@ -22,7 +22,40 @@
 # (i1, i2, . . . in). All of the subscript components must be given and they must be within the valid range of the corresponding array dimensions. Accessed
 # using the element operator: x[ 1, 2 ] = y.
 
-# iter(): Returns an iterator for the array.
+# iter(): Returns an iterator for the array, yielding the values of the elements in storage order.
+
+# nditer( withIndex ): Returns an iterator visiting the elements in storage order, the order in which they are laid out in memory (row-major
+# for an array, but not for a transposed view). It yields the values, or (index tuple, value) pairs if withIndex is True.
+
+# fill( value ): Sets every element to the given value, one block of consecutive elements at a time.
+
+# copy_into( target ): Copies the elements into the target array, which must have the same shape or one this array broadcasts to.
+
+# Slicing: when some of the subscript components are slices (x[ 1, :, 2:5 ]) or are omitted (x[ 1 ]), the element operator returns a view:
+# a MultiArray sharing the elements of the original array, described by an offset and the stride of each of its dimensions. Integer
+# components remove their dimension from the view. No element is copied, and changes made through a view are seen by the array.
+# Assigning a single value to a slice sets every element of the view; assigning a MultiArray copies its elements into the view, broadcasting
+# them to the shape of the view.
+
+# shape(): Returns the tuple of the lengths of the dimensions.
+
+# reshape( d1, d2, . . . dn ): Returns a view of the same elements with the given dimensions (one of which may be -1 to be computed from
+# the others). The array must be contiguous, i.e. not a strided view.
+
+# transpose( a1, a2, . . . an ): Returns a view with the dimensions permuted: dimension k of the view is dimension ak of the array. By
+# default the dimensions are reversed.
+
+# copy(): Returns a new contiguous array holding a copy of the elements.
+
+# Arithmetic: x + y, x - y, x * y and x / y apply the operator element by element and return a new array. The other operand is a scalar
+# or an array whose shape is compatible under broadcasting: the shapes are aligned on their last dimensions, and a dimension of length 1
+# (or a missing one) is repeated to match the length of the other.
+
+# sum( axis ), min( axis ), max( axis ), mean( axis ): Reduces the elements along the given dimension (numbered from 0), returning an
+# array with that dimension removed, or a scalar for a 1-D array. With axis set to None, all elements are reduced to a scalar.
+
+import itertools
+import operator
 
 from Chapter_2.ArrayADT import Array
 
@@ -40,16 +73,22 @@ class MultiArray :
         for d in dimensions :
             assert d > 0, "Dimensions must be > 0."
             size *= d
-        print(self._dims)
         # Create the 1-D array to store the elements.
         self._elements = Array( size )
-        # Create a 1-D array to store the equation factors.
-        self._factors = Array( len(dimensions) )
-
-        for i in range(len(self._factors)):
-            self._factors[i] = 1
+        # The equation factors (the stride of each dimension), computed once. They are kept in a tuple rather than an
+        # Array since they are read on every element access. Views add their offset into the shared elements.
+        self._factors = MultiArray._computeFactors( self._dims )
+        self._offset = 0
 
-        self._computeFactors()
+    # Creates a view of the elements with the given offset, dimensions and factors.
+    @classmethod
+    def _view( cls, elements, offset, dims, factors ):
+        view = cls.__new__( cls )
+        view._elements = elements
+        view._dims = dims
+        view._factors = factors
+        view._offset = offset
+        return view
 
     # Returns the number of dimensions in the array.
     def numDims( self ):
@@ -60,40 +99,313 @@ class MultiArray :
         assert dim >= 0 and dim < len(self._dims),"Dimension component out of range."
         return self._dims[dim - 1]
 
+    # Returns the lengths of the dimensions.
+    def shape( self ):
+        return tuple( self._dims )
+
     # Clears the array by setting all elements to the given value.
     def clear( self, value ):
-        self._elements.clear( value )
+        self.fill( value )
+
+    # Sets every element to the given value, assigning each run of elements along the last dimension as a slice.
+    def fill( self, value ):
+        if self._offset == 0 and self._size() == len( self._elements ) and self._isContiguous() :
+            self._elements.clear( value )
+            return
+        for start, step, count in self._runs():
+            self._elements[MultiArray._runSlice( start, step, count )] = [value] * count
+
+    # Copies the elements into the target array. The values are all read before any is written, so the arrays may share elements.
+    def copy_into( self, target ):
+        dims = MultiArray._broadcastDims( self._dims, target._dims )
+        assert dims == tuple( target._dims ), "The array does not broadcast to the shape of the target."
+        values = list( self._broadcast( dims )._values() )
+        pos = 0
+        for start, step, count in target._runs():
+            target._elements[MultiArray._runSlice( start, step, count )] = values[pos:pos + count]
+            pos += count
 
-    # Returns the contents of element (i_1, i_2, ..., i_n).
+    # Returns an iterator of the values in storage order.
+    def __iter__( self ):
+        return _MultiArrayIterator( self, False )
+
+    # Returns an iterator of the values, or of the (index tuple, value) pairs, in storage order.
+    def nditer( self, withIndex = False ):
+        return _MultiArrayIterator( self, withIndex )
+
+    # Returns the contents of element (i_1, i_2, ..., i_n), or a view if components are slices or are omitted.
     def __getitem__( self, ndxTuple ):
-        assert len(ndxTuple) == self.numDims(), "Invalid # of array subscripts."
+        if type( ndxTuple ) is not tuple :
+            ndxTuple = (ndxTuple,)
+        if len( ndxTuple ) != len( self._dims ) or slice in map( type, ndxTuple ) :
+            return self._slice( ndxTuple )
         index = self._computeIndex( ndxTuple )
         assert index is not None, "Array subscript out of range."
         return self._elements[index]
 
-    # Sets the contents of element (i_1, i_2, ..., i_n).
+    # Sets the contents of element (i_1, i_2, ..., i_n), or of every element of the view if components are slices or are omitted.
     def __setitem__( self, ndxTuple, value ):
-        assert len(ndxTuple) == self.numDims(), "Invalid # of array subscripts."
+        if type( ndxTuple ) is not tuple :
+            ndxTuple = (ndxTuple,)
+        if len( ndxTuple ) != len( self._dims ) or slice in map( type, ndxTuple ) :
+            view = self._slice( ndxTuple )
+            if isinstance( value, MultiArray ) :
+                value.copy_into( view )
+            else :
+                assert not isinstance( value, (list, tuple) ), "Only a single value or a MultiArray can be assigned to a slice."
+                view.fill( value )
+            return
         index = self._computeIndex( ndxTuple )
         assert index is not None, "Array subscript out of range."
         self._elements[index] = value
 
-    # Computes the 1-D array offset for element (i_1, i_2, ... i_n) using the equation i_1 * f_1 + i_2 * f_2 + ... + i_n * f_n
+    # Returns a view with the given dimensions, sharing the elements.
+    def reshape( self, *dimensions ):
+        size = self._size()
+        dimensions = list( dimensions )
+        if -1 in dimensions :
+            known = 1
+            for d in dimensions :
+                if d != -1 :
+                    known *= d
+            assert dimensions.count( -1 ) == 1 and known > 0 and size % known == 0, "Invalid dimensions."
+            dimensions[dimensions.index( -1 )] = size // known
+        total = 1
+        for d in dimensions :
+            assert d >= 0, "Dimensions must be >= 0."
+            total *= d
+        assert total == size, "The dimensions must hold the same number of elements."
+        assert self._isContiguous(), "Only a contiguous array can be reshaped; use copy() first."
+        return MultiArray._view( self._elements, self._offset, tuple( dimensions ), MultiArray._computeFactors( dimensions ) )
+
+    # Returns a view with the dimensions permuted.
+    def transpose( self, *axes ):
+        if not axes :
+            axes = tuple( range( len( self._dims ) - 1, -1, -1 ) )
+        assert sorted( axes ) == list( range( len( self._dims ) ) ), "Invalid permutation of the dimensions."
+        return MultiArray._view( self._elements, self._offset, tuple( self._dims[a] for a in axes ),
+                                 tuple( self._factors[a] for a in axes ) )
+
+    # Returns a new contiguous array holding a copy of the elements.
+    def copy( self ):
+        return MultiArray._fromValues( self._dims, list( self._values() ) )
+
+    # Element-wise arithmetic with a scalar or a broadcast array.
+    def __add__( self, rhs ):
+        return self._elementwise( rhs, operator.add )
+
+    def __sub__( self, rhs ):
+        return self._elementwise( rhs, operator.sub )
+
+    def __mul__( self, rhs ):
+        return self._elementwise( rhs, operator.mul )
+
+    def __truediv__( self, rhs ):
+        return self._elementwise( rhs, operator.truediv )
+
+    def __radd__( self, lhs ):
+        return self._elementwise( lhs, operator.add, True )
+
+    def __rsub__( self, lhs ):
+        return self._elementwise( lhs, operator.sub, True )
+
+    def __rmul__( self, lhs ):
+        return self._elementwise( lhs, operator.mul, True )
+
+    def __rtruediv__( self, lhs ):
+        return self._elementwise( lhs, operator.truediv, True )
+
+    # Returns the sum of the elements along the given dimension, or of all elements.
+    def sum( self, axis = None ):
+        return self._reduce( axis, operator.add, sum )
+
+    # Returns the smallest element along the given dimension, or of all elements.
+    def min( self, axis = None ):
+        return self._reduce( axis, min, min )
+
+    # Returns the largest element along the given dimension, or of all elements.
+    def max( self, axis = None ):
+        return self._reduce( axis, max, max )
+
+    # Returns the mean of the elements along the given dimension, or of all elements.
+    def mean( self, axis = None ):
+        count = self._size() if axis is None else self._dims[axis]
+        assert count > 0, "Cannot reduce an empty array."
+        return self.sum( axis ) / count
+
+    # Applies the operator to the elements of the array and the other operand, in row-major order, returning a new array.
+    # The operands are swapped when the array is the right-hand operand.
+    def _elementwise( self, other, op, reflected = False ):
+        if isinstance( other, MultiArray ) :
+            dims = MultiArray._broadcastDims( self._dims, other._dims )
+            otherValues = other._broadcast( dims )._values()
+        else :
+            dims = tuple( self._dims )
+            otherValues = itertools.repeat( other )
+        values = self._broadcast( dims )._values()
+        if reflected :
+            values, otherValues = otherValues, values
+        return MultiArray._fromValues( dims, list( map( op, values, otherValues ) ) )
+
+    # Reduces the elements along the axis with the binary function, or all of them with the whole function. The values are
+    # read once in row-major order; for each position of the dimensions before the axis, the runs of elements that follow the
+    # axis are combined pairwise, or the elements along the axis are reduced at once when the axis is the last dimension.
+    def _reduce( self, axis, binary, whole ):
+        values = list( self._values() )
+        if axis is None :
+            return whole( values )
+        assert axis >= 0 and axis < len( self._dims ), "Dimension component out of range."
+        count = self._dims[axis]
+        assert count > 0, "Cannot reduce along an empty dimension."
+        inner = 1
+        for d in self._dims[axis + 1:] :
+            inner *= d
+
+        result = list()
+        block = count * inner
+        for base in range( 0, len( values ), block ):
+            if inner == 1 :
+                result.append( whole( values[base:base + count] ) )
+            else :
+                accumulator = values[base:base + inner]
+                for start in range( base + inner, base + block, inner ):
+                    accumulator = list( map( binary, accumulator, values[start:start + inner] ) )
+                result.extend( accumulator )
+
+        dims = tuple( self._dims[:axis] ) + tuple( self._dims[axis + 1:] )
+        if not dims :
+            return result[0]
+        return MultiArray._fromValues( dims, result )
+
+    # Returns the shape resulting from broadcasting two shapes against each other.
+    @staticmethod
+    def _broadcastDims( dims, otherDims ):
+        extra = len( dims ) - len( otherDims )
+        dims = (1,) * -extra + tuple( dims )
+        otherDims = (1,) * extra + tuple( otherDims )
+        result = list()
+        for d, otherD in zip( dims, otherDims ):
+            assert d == otherD or d == 1 or otherD == 1, "Array shapes are not compatible for broadcasting."
+            result.append( otherD if d == 1 else d )
+        return tuple( result )
+
+    # Returns a view of the array broadcast to the given dimensions: the repeated dimensions have a factor of 0.
+    def _broadcast( self, dims ):
+        if tuple( dims ) == tuple( self._dims ) :
+            return self
+        extra = len( dims ) - len( self._dims )
+        factors = [0] * extra
+        for d, f, target in zip( self._dims, self._factors, dims[extra:] ):
+            factors.append( f if d == target else 0 )
+        return MultiArray._view( self._elements, self._offset, tuple( dims ), tuple( factors ) )
+
+    # Returns an iterator of the values of the elements in row-major order of the subscripts. Each run along the last dimension
+    # is read as a slice of the elements.
+    def _values( self ):
+        elements = self._elements
+        for start, step, count in self._runs():
+            if step == 0 :
+                yield from itertools.repeat( elements[start], count )
+            else :
+                yield from elements[MultiArray._runSlice( start, step, count )]
+
+    # Creates a contiguous array with the given dimensions holding the values listed in row-major order.
+    @staticmethod
+    def _fromValues( dims, values ):
+        elements = Array( max( len( values ), 1 ) )
+        elements[0:len( values )] = values
+        return MultiArray._view( elements, 0, tuple( dims ), MultiArray._computeFactors( dims ) )
+
+    # Returns the view selected by a subscript containing slices or fewer components than there are dimensions.
+    def _slice( self, ndxTuple ):
+        assert len( ndxTuple ) <= len( self._dims ), "Invalid # of array subscripts."
+        offset = self._offset
+        dims = list()
+        factors = list()
+        for axis, (d, f) in enumerate( zip( self._dims, self._factors ) ):
+            ndx = ndxTuple[axis] if axis < len( ndxTuple ) else slice( None )
+            if type( ndx ) is slice :
+                start, stop, step = ndx.indices( d )
+                length = len( range( start, stop, step ) )
+                if length > 0 :
+                    offset += start * f
+                dims.append( length )
+                factors.append( f * step )
+            else :
+                assert 0 <= ndx < d, "Array subscript out of range."
+                offset += ndx * f
+        return MultiArray._view( self._elements, offset, tuple( dims ), tuple( factors ) )
+
+    # Returns the number of elements.
+    def _size( self ):
+        size = 1
+        for d in self._dims :
+            size *= d
+        return size
+
+    # Returns True if the elements are stored consecutively in row-major order.
+    def _isContiguous( self ):
+        if self._size() == 0 :
+            return True
+        expected = 1
+        for d, f in zip( reversed( self._dims ), reversed( self._factors ) ):
+            if d > 1 and f != expected :
+                return False
+            expected *= d
+        return True
+
+    # Returns an iterator of the 1-D array offsets of the elements, in row-major order of the subscripts.
+    def _offsets( self ):
+        return itertools.chain.from_iterable( range( start, start + count * step, step ) if step else itertools.repeat( start, count )
+                                              for start, step, count in self._runs() )
+
+    # Returns an iterator of the (start, step, count) runs of 1-D array offsets along the last dimension, in row-major order of the
+    # subscripts. A contiguous array is a single run.
+    def _runs( self ):
+        size = self._size()
+        if size == 0 :
+            return iter( () )
+        if self._isContiguous() :
+            return iter( [(self._offset, 1, size)] )
+        inner = self._dims[-1]
+        step = self._factors[-1]
+        outer = [[i * f for i in range( d )] for d, f in zip( self._dims[:-1], self._factors[:-1] )]
+        return ((self._offset + sum( parts ), step, inner) for parts in itertools.product( *outer ))
+
+    # Returns the slice of the 1-D array holding a run.
+    @staticmethod
+    def _runSlice( start, step, count ):
+        stop = start + count * step
+        # A run going down to element 0 must not stop at -1, which would mean the end of the array.
+        return slice( start, stop if stop >= 0 else None, step )
+
+    # Computes the 1-D array offset for element (i_1, i_2, ... i_n) using the equation i_1 * f_1 + i_2 * f_2 + ... + i_n * f_n, checking
+    # each index component against its dimension as it is added. Returns None if a component is out of range.
     def _computeIndex( self, idx ):
-        offset = 0
-        for j in range( len(idx) ):
-        # Make sure the index components are within the legal range.
-            if idx[j] < 0 or idx[j] >= self._dims[j] :
+        # Specialized path for the common 3-D case.
+        if len( idx ) == 3 and len( self._dims ) == 3 :
+            i, j, k = idx
+            d1, d2, d3 = self._dims
+            if 0 <= i < d1 and 0 <= j < d2 and 0 <= k < d3 :
+                f1, f2, f3 = self._factors
+                return self._offset + i * f1 + j * f2 + k * f3
+            return None
+
+        offset = self._offset
+        for i, d, f in zip( idx, self._dims, self._factors ):
+            if not 0 <= i < d :
                 return None
-        else :
-            offset += idx[j] * self._factors[j]
+            offset += i * f
         return offset
 
-    # Computes the factor values used in the index equation.
-    def _computeFactors( self ):
-        for j in range( len(self._dims) - 1 ) :
-            self._factors[j + 1] = self._dims[j] * self._factors[j]
-            self._factors[0] = 1
+    # Computes the factor values used in the index equation for the row-major layout of the given dimensions: the last index
+    # varies fastest, so f_n = 1 and f_j = d_(j+1) * f_(j+1).
+    @staticmethod
+    def _computeFactors( dims ):
+        factors = [1] * len( dims )
+        for j in range( len( dims ) - 2, -1, -1 ):
+            factors[j] = dims[j + 1] * factors[j + 1]
+        return tuple( factors )
     
     # # Returns the array's string representation.
     # def __str__( self ):
@@ -103,6 +415,43 @@ class MultiArray :
     # def __repr__( self ):
     #     return repr(self._elements)
     
+# An iterator for the MultiArray ADT visiting the elements in storage order. The dimensions are visited from the largest factor
+# to the smallest, and the index and the 1-D array offset are updated incrementally as in an odometer.
+class _MultiArrayIterator :
+    def __init__( self, multiArray, withIndex ):
+        self._elements = multiArray._elements
+        self._withIndex = withIndex
+        self._dims = multiArray._dims
+        self._factors = multiArray._factors
+        # The dimensions from the innermost (smallest factor) to the outermost.
+        self._order = sorted( range( len( self._dims ) ), key = lambda axis: (-abs( self._factors[axis] ), axis) )[::-1]
+        self._index = [0] * len( self._dims )
+        self._offset = multiArray._offset
+        self._remaining = multiArray._size()
+
+    def __iter__( self ):
+        return self
+
+    def __next__( self ):
+        if self._remaining == 0 :
+            raise StopIteration
+        self._remaining -= 1
+        value = self._elements[self._offset]
+        index = tuple( self._index ) if self._withIndex else None
+
+        # Advance the index: the innermost dimension moves by one; a dimension that wraps around carries into the next one.
+        for axis in self._order :
+            self._index[axis] += 1
+            self._offset += self._factors[axis]
+            if self._index[axis] < self._dims[axis] :
+                break
+            self._index[axis] = 0
+            self._offset -= self._dims[axis] * self._factors[axis]
+
+        if self._withIndex :
+            return index, value
+        return value
+
 # Test program
 if __name__ == '__main__':
     # Example 1: Creating a 2D MultiArray (3 rows x 4 columns)
@@ -0,0 +1,286 @@
+# An out-of-core multi-dimensional array. The index space is split into chunks of a fixed shape, each stored on disk as a typed array,
+# optionally compressed with zlib. Chunks are loaded on demand into an LRU cache holding at most a given number of bytes; modified chunks
+# are written back when they are evicted or when the array is flushed. A chunk that was never written is not stored at all: all of its
+# elements have the fill value. Only numbers of the type given by an array typecode ('d' by default) can be stored.
+
+# ChunkedMultiArray( path, dims, chunkShape, typecode, compress, layout, fill, cacheBytes ): Creates an array with the given dimensions
+# stored at path, replacing any array already there. The layout is 'directory' (one file per chunk in the directory path) or 'file' (all
+# chunks in the single file path). With dims set to None, the array stored at path is opened instead and only cacheBytes is used.
+
+# numDims(), length( dim ), shape(): The number of dimensions, the length of dimension dim (numbered from 0) and the tuple of lengths.
+
+# getitem ( i1, i2, . . . in ), setitem ( i1, i2, . . . in, value ): Element access, as for MultiArray: y = x[ 1, 2, 3 ], x[ 1, 2, 3 ] = y.
+
+# clear( value ): Sets every element to value by discarding all of the stored chunks.
+
+# flush(): Writes the modified chunks in the cache back to disk.
+
+# close(): Flushes the array and closes its storage. The array can also be used as a context manager.
+
+# In the single file layout, a compressed chunk whose size changes is appended to the end of the file; the space it used is not reused.
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+
+from Chapter_3.ArrayND import MultiArray
+
+# The default budget of the chunk cache in bytes.
+DEFAULT_CACHE_BYTES = 64 << 20
+
+# The default number of elements of a chunk, used to choose a chunk shape when none is given.
+DEFAULT_CHUNK_ELEMENTS = 1 << 16
+
+# The single file layout: a header holding the magic number and the length of the JSON metadata that follows, then the index giving the
+# offset and length of each chunk (0, 0 for a chunk that is not stored), then the chunks.
+_FILE_MAGIC = b'CMA1'
+_FILE_HEADER = struct.Struct( '<4sI' )
+_INDEX_ENTRY = struct.Struct( '<QQ' )
+
+# The name of the metadata file of the directory layout.
+_META_NAME = 'meta.json'
+
+class ChunkedMultiArray :
+    # Creates a new chunked array, or opens the one stored at path.
+    def __init__( self, path, dims = None, chunkShape = None, typecode = 'd', compress = False, layout = 'directory', fill = 0,
+                  cacheBytes = DEFAULT_CACHE_BYTES ):
+        assert cacheBytes > 0, "The cache budget must be > 0."
+        self._path = path
+        self._cacheBytes = cacheBytes
+        self._cache = OrderedDict()
+        self._file = None
+        if dims is None :
+            self._open()
+        else :
+            assert layout in ('directory', 'file'), "Invalid storage layout."
+            assert len( dims ) > 0, "The array must have at least 1 dimension."
+            for d in dims :
+                assert d > 0, "Dimensions must be > 0."
+            if chunkShape is None :
+                chunkShape = _defaultChunkShape( dims )
+            assert len( chunkShape ) == len( dims ), "The chunk shape must have one length per dimension."
+            for c in chunkShape :
+                assert c > 0, "Chunk lengths must be > 0."
+            self._setup( { 'dims' : list( dims ), 'chunkShape' : list( chunkShape ), 'typecode' : typecode,
+                           'compress' : bool( compress ), 'layout' : layout, 'fill' : fill } )
+            self._create()
+
+    # Returns the number of dimensions in the array.
+    def numDims( self ):
+        return len( self._dims )
+
+    # Returns the length of the given dimension.
+    def length( self, dim ):
+        assert dim >= 0 and dim < len( self._dims ), "Dimension component out of range."
+        return self._dims[dim]
+
+    # Returns the lengths of the dimensions.
+    def shape( self ):
+        return self._dims
+
+    # Sets every element to the given value.
+    def clear( self, value ):
+        self._meta['fill'] = value
+        self._cache.clear()
+        self._create()
+
+    # Returns the contents of element (i_1, i_2, ..., i_n).
+    def __getitem__( self, ndxTuple ):
+        key, offset = self._locate( ndxTuple )
+        return self._chunk( key )[0][offset]
+
+    # Sets the contents of element (i_1, i_2, ..., i_n).
+    def __setitem__( self, ndxTuple, value ):
+        key, offset = self._locate( ndxTuple )
+        entry = self._chunk( key )
+        entry[0][offset] = value
+        entry[1] = True
+
+    # Writes the modified chunks in the cache back to disk.
+    def flush( self ):
+        for key, entry in self._cache.items() :
+            if entry[1] :
+                self._writeChunk( key, entry[0] )
+                entry[1] = False
+        if self._file is not None :
+            self._file.flush()
+
+    # Flushes the array and closes its storage.
+    def close( self ):
+        self.flush()
+        self._cache.clear()
+        if self._file is not None :
+            self._file.close()
+            self._file = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *excInfo ):
+        self.close()
+
+    # Sets the attributes described by the metadata.
+    def _setup( self, meta ):
+        self._meta = meta
+        self._dims = tuple( meta['dims'] )
+        self._chunkShape = tuple( meta['chunkShape'] )
+        self._typecode = meta['typecode']
+        self._compress = meta['compress']
+        self._layout = meta['layout']
+        # The number of chunks along each dimension, and the factors of the row-major equations locating a chunk in the grid
+        # and an element in its chunk.
+        self._gridShape = tuple( -(-d // c) for d, c in zip( self._dims, self._chunkShape ) )
+        self._gridFactors = MultiArray._computeFactors( self._gridShape )
+        self._chunkFactors = MultiArray._computeFactors( self._chunkShape )
+        self._chunkSize = 1
+        for c in self._chunkShape :
+            self._chunkSize *= c
+        self._numChunks = 1
+        for g in self._gridShape :
+            self._numChunks *= g
+        self._chunkBytes = self._chunkSize * array( self._typecode ).itemsize
+
+    # Writes the metadata of a new array, with no chunk stored. The chunks of an array already stored in the directory are removed.
+    def _create( self ):
+        meta = json.dumps( self._meta ).encode()
+        if self._layout == 'directory' :
+            os.makedirs( self._path, exist_ok = True )
+            for name in os.listdir( self._path ) :
+                if name.endswith( ('.chunk', '.chunk.tmp') ) :
+                    os.remove( os.path.join( self._path, name ) )
+            with open( os.path.join( self._path, _META_NAME ), 'wb' ) as stream :
+                stream.write( meta )
+        else :
+            if self._file is not None :
+                self._file.close()
+            self._file = open( self._path, 'w+b' )
+            self._file.write( _FILE_HEADER.pack( _FILE_MAGIC, len( meta ) ) + meta )
+            self._indexStart = self._file.tell()
+            self._file.write( bytes( _INDEX_ENTRY.size * self._numChunks ) )
+            self._file.flush()
+
+    # Reads the metadata of the array stored at path.
+    def _open( self ):
+        if os.path.isdir( self._path ) :
+            with open( os.path.join( self._path, _META_NAME ), 'rb' ) as stream :
+                self._setup( json.loads( stream.read() ) )
+        else :
+            self._file = open( self._path, 'r+b' )
+            magic, metaLength = _FILE_HEADER.unpack( self._file.read( _FILE_HEADER.size ) )
+            assert magic == _FILE_MAGIC, "Not a chunked array file."
+            self._setup( json.loads( self._file.read( metaLength ) ) )
+            self._indexStart = self._file.tell()
+
+    # Returns the key of the chunk holding element (i_1, i_2, ..., i_n) and the offset of the element within the chunk.
+    def _locate( self, ndxTuple ):
+        assert len( ndxTuple ) == len( self._dims ), "Invalid # of array subscripts."
+        key = 0
+        offset = 0
+        for i, d, c, gf, cf in zip( ndxTuple, self._dims, self._chunkShape, self._gridFactors, self._chunkFactors ):
+            assert 0 <= i < d, "Array subscript out of range."
+            key += (i // c) * gf
+            offset += (i % c) * cf
+        return key, offset
+
+    # Returns the cache entry [elements, dirty] of the chunk, loading it on a miss and evicting the least recently used chunks
+    # beyond the budget.
+    def _chunk( self, key ):
+        entry = self._cache.get( key )
+        if entry is not None :
+            self._cache.move_to_end( key )
+            return entry
+        entry = [self._readChunk( key ), False]
+        self._cache[key] = entry
+        # The chunk just loaded is always kept, even if it alone exceeds the budget.
+        while len( self._cache ) > 1 and len( self._cache ) * self._chunkBytes > self._cacheBytes :
+            oldKey, (elements, dirty) = self._cache.popitem( last = False )
+            if dirty :
+                self._writeChunk( oldKey, elements )
+        return entry
+
+    # Reads a chunk from disk, or creates it filled with the fill value if it is not stored.
+    def _readChunk( self, key ):
+        data = None
+        if self._layout == 'directory' :
+            name = self._chunkPath( key )
+            if os.path.exists( name ) :
+                with open( name, 'rb' ) as stream :
+                    data = stream.read()
+        else :
+            offset, length = self._indexEntry( key )
+            if length > 0 :
+                self._file.seek( offset )
+                data = self._file.read( length )
+        if data is None :
+            return array( self._typecode, [self._meta['fill']] ) * self._chunkSize
+
+        if self._compress :
+            data = zlib.decompress( data )
+        elements = array( self._typecode )
+        elements.frombytes( data )
+        # Chunks are stored in little-endian byte order.
+        if sys.byteorder == 'big' :
+            elements.byteswap()
+        return elements
+
+    # Writes a chunk to disk.
+    def _writeChunk( self, key, elements ):
+        if sys.byteorder == 'big' :
+            elements = array( self._typecode, elements )
+            elements.byteswap()
+        data = elements.tobytes()
+        if self._compress :
+            data = zlib.compress( data )
+
+        if self._layout == 'directory' :
+            # Written to a temporary file first so that a crash never leaves a partial chunk.
+            name = self._chunkPath( key )
+            with open( name + '.tmp', 'wb' ) as stream :
+                stream.write( data )
+            os.replace( name + '.tmp', name )
+        else :
+            offset, length = self._indexEntry( key )
+            if length != len( data ) :
+                offset = self._file.seek( 0, os.SEEK_END )
+            self._file.seek( offset )
+            self._file.write( data )
+            self._file.seek( self._indexStart + key * _INDEX_ENTRY.size )
+            self._file.write( _INDEX_ENTRY.pack( offset, len( data ) ) )
+
+    # Returns the (offset, length) index entry of a chunk of the single file layout.
+    def _indexEntry( self, key ):
+        self._file.seek( self._indexStart + key * _INDEX_ENTRY.size )
+        return _INDEX_ENTRY.unpack( self._file.read( _INDEX_ENTRY.size ) )
+
+    # Returns the name of the file of a chunk of the directory layout, built from its position in the grid of chunks.
+    def _chunkPath( self, key ):
+        coords = list()
+        for g in self._gridFactors :
+            coords.append( str( key // g ) )
+            key %= g
+        return os.path.join( self._path, '_'.join( coords ) + '.chunk' )
+
+# Returns a chunk shape of about DEFAULT_CHUNK_ELEMENTS elements with the same length along every dimension, but no longer than the
+# dimensions.
+def _defaultChunkShape( dims ):
+    side = max( 1, round( DEFAULT_CHUNK_ELEMENTS ** (1.0 / len( dims )) ) )
+    return tuple( min( d, side ) for d in dims )
+
+if __name__ == '__main__':
+    import tempfile
+
+    # A 4-D array of 8 million elements, of which only a few chunks are ever stored.
+    with tempfile.TemporaryDirectory() as workDir :
+        path = os.path.join( workDir, 'volume' )
+        with ChunkedMultiArray( path, (20, 100, 100, 40), (1, 50, 50, 40), compress = True, cacheBytes = 4 << 20 ) as volume :
+            for t in range( 20 ):
+                for x in range( 100 ):
+                    volume[t, x, x, t] = t + x / 100
+        with ChunkedMultiArray( path ) as volume :
+            print( "Shape:", volume.shape() )
+            print( "volume[3, 42, 42, 3] =", volume[3, 42, 42, 3], "volume[3, 42, 41, 3] =", volume[3, 42, 41, 3] )
+        print( "Chunk files:", len( os.listdir( path ) ) - 1 )
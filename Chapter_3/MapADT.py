@@ -1,6 +1,6 @@
-# Implement a Map ADT which will work as python dictionary but implemented with list for minimum functionality
+# Implement a Map ADT which will work as python dictionary, implemented with an open addressing hash table built on the Array ADT.
 # A map is a container for storing a collection of data records in which each record
-# is associated with a unique key. The key components must be comparable.
+# is associated with a unique key. The key components must be hashable.
 # Map(): Creates a new empty map.
 # length (): Returns the number of key/value pairs in the map.
 # contains ( key ): Determines if the given key is in the map and returns True
@@ -14,14 +14,29 @@
 # valueOf( key ): Returns the data record associated with the given key. The
 # key must exist in the map or an exception is raised.
 # iterator (): Creates and returns an iterator that can be used to iterate over
-# the keys in the map.
+# the keys in the map, in the order they were added.
+#
+# The entries are kept in insertion order in an array, where a removed entry leaves a hole. A second array, the hash table, maps
+# each key to the position of its entry: a key is looked up by linear probing from the slot selected by its hash code. A removed
+# key leaves a tombstone in its slot so that the probing of the keys after it still finds them. The table holds at most 2/3 as
+# many entries as it has slots; when the entry array is full, both arrays are rebuilt without the holes and tombstones, at a size
+# leaving room for as many keys again.
+
+from Chapter_2.ArrayADT import Array
+
+# The initial number of slots of the hash table; always a power of 2.
+INITIAL_CAPACITY = 8
+
+# Marks a slot of the hash table whose key was removed.
+_TOMBSTONE = object()
 
 class Map:
     def __init__(self):
         """
         Initialize an empty map.
         """
-        self._entryList = list()
+        self._size = 0
+        self._allocate(INITIAL_CAPACITY)
 
     def __len__(self):
         """
@@ -30,7 +45,7 @@ class Map:
         :return: The size of the map.
         :rtype: int
         """
-        return len(self._entryList)
+        return self._size
 
     def __contains__(self, key):
         """
@@ -72,13 +87,19 @@ class Map:
         :return: True if a new key was added, False if an existing key was updated.
         :rtype: bool
         """
-        ndx = self._findPosition(key)
+        hashCode = hash(key)
+        slot, ndx = self._lookup(key, hashCode)
         if ndx is not None:
-            self._entryList[ndx].value = value
+            self._entries[ndx].value = value
             return False
         else:
-            entry = _MapEntry(key, value)
-            self._entryList.append(entry)
+            if self._numUsed == len(self._entries):
+                self._resize()
+                slot, ndx = self._lookup(key, hashCode)
+            self._entries[self._numUsed] = _MapEntry(key, value, hashCode)
+            self._slots[slot] = self._numUsed
+            self._numUsed += 1
+            self._size += 1
             return True
 
     def remove(self, key):
@@ -88,9 +109,11 @@ class Map:
         :param key: The key of the entry to remove.
         :raises KeyError: If the key does not exist in the map.
         """
-        ndx = self._findPosition(key)
+        slot, ndx = self._lookup(key, hash(key))
         assert ndx is not None, "Invalid map key."
-        self._entryList.pop(ndx)
+        self._slots[slot] = _TOMBSTONE
+        self._entries[ndx] = None
+        self._size -= 1
 
     def valueOf(self, key):
         """
@@ -102,7 +125,7 @@ class Map:
         """
         ndx = self._findPosition(key)
         assert ndx is not None, "Invalid map key."
-        return self._entryList[ndx].value
+        return self._entries[ndx].value
 
     def __iter__(self):
         """
@@ -111,21 +134,76 @@ class Map:
         :return: An iterator for the map's keys.
         :rtype: _MapIterator
         """
-        return _MapIterator(self._entryList)
+        return _MapIterator(self._entries, self._numUsed)
 
     def _findPosition(self, key):
         """
-        Find the index position of a key in the map. Used internally.
+        Find the index position of a key in the entry array. Used internally.
         
         :param key: The key to find.
         :return: The index position of the key if found, None otherwise.
         :rtype: int or None
         """
-        n = len(self)
-        for i in range(n):
-            if self._entryList[i].key == key:
-                return i
-        return None
+        return self._lookup(key, hash(key))[1]
+
+    def _lookup(self, key, hashCode):
+        """
+        Probe the hash table for a key. Used internally.
+
+        :param key: The key to find.
+        :param hashCode: The hash code of the key.
+        :return: The slot of the key and the index position of its entry if found; otherwise the slot where the key is to be
+            inserted (the first tombstone passed, or the empty slot ending the probe) and None.
+        :rtype: tuple
+        """
+        mask = len(self._slots) - 1
+        slot = hashCode & mask
+        insertSlot = None
+        while True:
+            ndx = self._slots[slot]
+            if ndx is None:
+                return (slot if insertSlot is None else insertSlot), None
+            if ndx is _TOMBSTONE:
+                if insertSlot is None:
+                    insertSlot = slot
+            else:
+                entry = self._entries[ndx]
+                if entry.hashCode == hashCode and (entry.key is key or entry.key == key):
+                    return slot, ndx
+            slot = (slot + 1) & mask
+
+    def _allocate(self, capacity):
+        """
+        Create empty arrays for the hash table and the entries. Used internally.
+
+        :param capacity: The number of slots of the hash table, a power of 2.
+        """
+        self._slots = Array(capacity)
+        self._entries = Array(capacity * 2 // 3)
+        self._numUsed = 0
+
+    def _resize(self):
+        """
+        Rebuild the hash table and the entry array without the removed entries, leaving room for as many new keys as there
+        are keys in the map. Used internally.
+        """
+        entries = self._entries
+        numUsed = self._numUsed
+        capacity = INITIAL_CAPACITY
+        while capacity * 2 // 3 < 2 * self._size + 1:
+            capacity *= 2
+        self._allocate(capacity)
+
+        mask = capacity - 1
+        for i in range(numUsed):
+            entry = entries[i]
+            if entry is not None:
+                slot = entry.hashCode & mask
+                while self._slots[slot] is not None:
+                    slot = (slot + 1) & mask
+                self._slots[slot] = self._numUsed
+                self._entries[self._numUsed] = entry
+                self._numUsed += 1
 
     def __str__(self):
         """
@@ -135,9 +213,9 @@ class Map:
         :rtype: str
         """
         result = "{"
-        for i, entry in enumerate(self._entryList):
-            result += f"{entry.key}: {entry.value}"
-            if i < len(self._entryList) - 1:
+        for i, key in enumerate(self):
+            result += f"{key}: {self.valueOf(key)}"
+            if i < len(self) - 1:
                 result += ", "
         result += "}"
         return result
@@ -161,35 +239,37 @@ class Map:
         :return: A new map containing the combined entries.
         """
         newMap = Map()
-        for entry in self:
-            newMap.add( entry.key, entry.value )
-        for entry in other:
-            newMap.add( entry.key, entry.value )
+        for key in self:
+            newMap.add( key, self.valueOf( key ) )
+        for key in other:
+            newMap.add( key, other.valueOf( key ) )
         return newMap
     
 
-# Iterator class for map.
+# Iterator class for map. Skips the holes left by removed entries.
 class _MapIterator :
-    def __init__( self, entryList ):
-        self._entryList = entryList
+    def __init__( self, entries, numUsed ):
+        self._entries = entries
+        self._numUsed = numUsed
         self._curNdx = 0
 
     def __iter__( self ):
         return self
     
     def __next__( self ):
-        if self._curNdx < len( self._entryList ):
-            entry = self._entryList[ self._curNdx ]
+        while self._curNdx < self._numUsed:
+            entry = self._entries[ self._curNdx ]
             self._curNdx += 1
-            return entry.key
-        else:
-            raise StopIteration
+            if entry is not None:
+                return entry.key
+        raise StopIteration
 
-# Storage class for holding the key/value pairs.
+# Storage class for holding the key/value pairs, with the hash code of the key.
 class _MapEntry :
-    def __init__( self, key, value ):
+    def __init__( self, key, value, hashCode ):
         self.key = key
         self.value = value
+        self.hashCode = hashCode
 
 # Test code
 if __name__ == "__main__":
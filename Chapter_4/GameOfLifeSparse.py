@@ -1,35 +1,98 @@
 # GameOfLifeSparse.py
+import os
+import sys
+
 from SparseLifeGrid import SparseLifeGrid
 
-# Define the initial configuration of live cells.
+# The game of Life support modules live next to the dense LifeGrid in Chapter_2.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chapter_2'))
+from LifeCheckpoint import Checkpointer
+from LifeHistory import CycleDetector
+from LifePatterns import loadPattern
+from LifeRule import LifeRule, CONWAY
+from LifeRender import FrameRenderer, renderGrid
+
+# Define the initial configuration of live cells, used when no RLE or plaintext pattern file is given on the command line.
 INIT_CONFIG = [(0, 0), (1, 1), (1, 2), (2, 0), (2, 1)]
 
 # Indicate the number of generations.
 NUM_GENS = 20
 
+# Render every Nth generation; 0 renders only the final generation.
+RENDER_EVERY = 1
+
+# Save a checkpoint every CHECKPOINT_EVERY generations to CHECKPOINT_PATH, and resume from it when it exists. None disables checkpoints.
+CHECKPOINT_PATH = None
+CHECKPOINT_EVERY = 1000
+
 def main():
     # Construct the game grid and configure it.
     grid = SparseLifeGrid()
-    grid.configure(INIT_CONFIG)
+    rule = CONWAY
+    if len(sys.argv) > 1:
+        notation = loadPattern(sys.argv[1], grid)
+        if notation is not None:
+            rule = LifeRule(notation)
+    else:
+        grid.configure(INIT_CONFIG)
+
+    # Resume an interrupted run from its last checkpoint.
+    startGen = 0
+    checkpointer = None
+    if CHECKPOINT_PATH is not None:
+        if os.path.exists(CHECKPOINT_PATH):
+            startGen = grid.restore(CHECKPOINT_PATH)
+        checkpointer = Checkpointer(grid, CHECKPOINT_PATH, CHECKPOINT_EVERY)
+    try:
+        play(grid, rule, startGen, checkpointer)
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+
+def play(grid, rule, startGen, checkpointer):
+    # Remember the generations played so the game can stop once the grid settles.
+    detector = CycleDetector()
+    detector.record(grid.stateHash())
 
     # Play the game.
-    draw(grid)
-    for i in range(NUM_GENS):
-        evolve(grid)
-        draw(grid)
+    renderer = FrameRenderer(every=RENDER_EVERY)
+    renderer.draw(grid, startGen)
+    for gen in range(startGen + 1, NUM_GENS + 1):
+        evolve(grid, rule)
+        if checkpointer is not None:
+            checkpointer.update(gen)
+        drawn = renderer.draw(grid, gen, final=(gen == NUM_GENS))
+        if detector.record(grid.stateHash()):
+            print('Generation %d repeats with period %d.' % (startGen + detector.firstRepeat(), detector.period()))
+            if skipToEnd(grid, rule, detector, NUM_GENS - gen) > 0 or not drawn:
+                renderer.draw(grid, NUM_GENS, final=True)
+            break
+
+def skipToEnd(grid, rule, detector, numGens):
+    # Play only the generations that are not part of a whole period of the detected cycle.
+    remaining = detector.remaining(numGens)
+    for i in range(remaining):
+        evolve(grid, rule)
+    return remaining
+
+def evolve(grid, rule=CONWAY):
+    # A rule giving birth to cells without neighbors would fill the infinite grid.
+    assert not rule.birthOnZero(), "B0 rules are not supported on an infinite grid."
+    if grid.minRange()[0] is None:
+        return
 
-def evolve(grid):
     # List for storing the live cells of the next generation.
     liveCells = []
+    table = rule.table()
 
-    # Iterate over the elements of the grid.
-    for row in range(grid.minRange()[0], grid.maxRange()[0] + 1):
-        for col in range(grid.minRange()[1], grid.maxRange()[1] + 1):
+    # Iterate over the elements of the grid, including the border of dead cells around the live ones where new cells can be born.
+    for row in range(grid.minRange()[0] - 1, grid.maxRange()[0] + 2):
+        for col in range(grid.minRange()[1] - 1, grid.maxRange()[1] + 2):
             # Determine the number of live neighbors for this cell.
             neighbors = grid.numLiveNeighbors(row, col)
 
             # Add the (row, col) tuple to liveCells if this cell contains a live organism in the next generation.
-            if (grid.isLiveCell(row, col) and neighbors == 2) or (neighbors == 3):
+            if table[grid.isLiveCell(row, col) * 9 + neighbors]:
                 liveCells.append((row, col))
 
     # Reconfigure the grid using the liveCells coord list.
@@ -37,14 +100,7 @@ def evolve(grid):
 
 def draw(grid):
     # Print a text-based representation of the game grid.
-    for row in range(grid.minRange()[0], grid.maxRange()[0] + 1):
-        line = ''
-        for col in range(grid.minRange()[1], grid.maxRange()[1] + 1):
-            if grid.isLiveCell(row, col):
-                line += '@ '
-            else:
-                line += '. '
-        print(line.strip())
+    print(renderGrid(grid))
     print()
 
 if __name__ == '__main__':
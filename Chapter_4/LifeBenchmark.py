@@ -0,0 +1,152 @@
+# LifeBenchmark.py
+# Headless benchmark of the game of Life grid backends. Each standard workload is played on every backend without rendering, and the
+# cell updates per second, the peak memory and the per-generation latency percentiles are reported as JSON.
+#
+# Usage: python LifeBenchmark.py [--gens N] [--size N] [--seed N] [--workloads name ...] [--backends name ...] [--output path]
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import GameOfLifeSparse
+from SparseLifeGrid import SparseLifeGrid
+
+# The dense grid and its driver live in Chapter_2.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chapter_2'))
+import GameOfLife
+from LifeGrid import LifeGrid
+from LifePatterns import readRLE
+
+# The reference patterns in RLE format.
+PATTERNS = {
+    'r-pentomino': 'x = 3, y = 3\nb2o$2o$bo!',
+    'acorn': 'x = 7, y = 3\nbo$3bo$2o2b3o!',
+    'gosper-gun': 'x = 36, y = 9\n24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$10bo5bo7bo$11bo3bo$12b2o!',
+}
+
+# The workloads, in the order they are run. The soup is a square of the given size with half of its cells alive.
+WORKLOADS = ['r-pentomino', 'acorn', 'gosper-gun', 'soup']
+
+# The grid backends: a factory creating an empty grid of the given size, and the evolve function driving it.
+BACKENDS = {
+    'dense': (lambda size: LifeGrid(size, size), GameOfLife.evolve),
+    'sparse': (lambda size: SparseLifeGrid(), GameOfLifeSparse.evolve),
+}
+
+# Default parameters.
+NUM_GENS = 100
+GRID_SIZE = 64
+SOUP_SIZE = 32
+SEED = 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the game of Life grid backends.')
+    parser.add_argument('--gens', type=int, default=NUM_GENS, help='number of generations per run')
+    parser.add_argument('--size', type=int, default=GRID_SIZE, help='rows and columns of the dense grid')
+    parser.add_argument('--seed', type=int, default=SEED, help='seed of the random soup')
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument('--output', help='write the JSON report to this file instead of standard output')
+    args = parser.parse_args()
+    assert args.gens > 0, "The number of generations must be > 0."
+    minSize = max(SOUP_SIZE if workload == 'soup' else max(patternSize(workload)) for workload in args.workloads)
+    assert args.size >= minSize, "The grid must be at least %d cells wide." % minSize
+
+    report = {
+        'python': platform.python_version(),
+        'generations': args.gens,
+        'gridSize': args.size,
+        'seed': args.seed,
+        'results': [runWorkload(workload, backend, args.gens, args.size, args.seed)
+                    for workload in args.workloads for backend in args.backends],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as stream:
+            stream.write(text + '\n')
+    else:
+        print(text)
+
+def runWorkload(workload, backend, numGens, size, seed):
+    # Times the run first and measures memory, grid included, in a second run since tracing allocations slows the evolve loop down.
+    makeGrid, evolve = BACKENDS[backend]
+    grid = makeGrid(size)
+    configure(grid, workload, size, seed)
+    latencies, cellUpdates = playTimed(grid, evolve, numGens)
+
+    tracemalloc.start()
+    grid = makeGrid(size)
+    configure(grid, workload, size, seed)
+    for i in range(numGens):
+        evolve(grid)
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    totalTime = sum(latencies)
+    return {
+        'workload': workload,
+        'backend': backend,
+        'cellUpdates': cellUpdates,
+        'seconds': totalTime,
+        'cellUpdatesPerSecond': cellUpdates / totalTime if totalTime > 0 else None,
+        'peakMemoryBytes': peakBytes,
+        'latencyMs': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p90': percentile(latencies, 90) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'max': max(latencies) * 1000,
+        },
+    }
+
+def configure(grid, workload, size, seed):
+    # Place the workload in the middle of the dense grid; the sparse grid uses the same coordinates.
+    if workload == 'soup':
+        rng = random.Random(seed)
+        origin = (size - SOUP_SIZE) // 2
+        grid.configure([(origin + r, origin + c) for r in range(SOUP_SIZE) for c in range(SOUP_SIZE) if rng.random() < 0.5])
+    else:
+        width, height = patternSize(workload)
+        readRLE(io.StringIO(PATTERNS[workload]), grid, (size - height) // 2, (size - width) // 2)
+
+def patternSize(workload):
+    # Returns the (width, height) given by the x and y fields of the header of a reference pattern.
+    fields = {}
+    for field in PATTERNS[workload].split('\n', 1)[0].split(','):
+        name, _, value = field.partition('=')
+        fields[name.strip()] = value.strip()
+    return int(fields['x']), int(fields['y'])
+
+def playTimed(grid, evolve, numGens):
+    # Returns the list of per-generation latencies in seconds and the total number of cells evaluated.
+    latencies = []
+    cellUpdates = 0
+    for i in range(numGens):
+        cellUpdates += cellsEvaluated(grid)
+        start = time.perf_counter()
+        evolve(grid)
+        latencies.append(time.perf_counter() - start)
+    return latencies, cellUpdates
+
+def cellsEvaluated(grid):
+    # The dense evolve visits every cell; the sparse one visits the bounding box plus a one-cell border.
+    if hasattr(grid, 'minRange'):
+        minRow, minCol = grid.minRange()
+        if minRow is None:
+            return 0
+        maxRow, maxCol = grid.maxRange()
+        return (maxRow - minRow + 3) * (maxCol - minCol + 3)
+    return grid.numRows() * grid.numCols()
+
+def percentile(values, pct):
+    # Nearest-rank percentile of the values.
+    ordered = sorted(values)
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[rank - 1]
+
+if __name__ == '__main__':
+    main()
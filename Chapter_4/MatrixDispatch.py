@@ -0,0 +1,149 @@
+# Mixed arithmetic between the dense Matrix ADT (Chapter 2) and the SparseMatrix ADT. Each operation picks the kernel that suits the
+# representations of its operands, and the result is stored in the representation suited to its density: the fraction of its elements
+# that are non-zero. A result denser than DENSE_THRESHOLD is a Matrix, any other result a SparseMatrix. A product that fills in thus
+# becomes dense, and a dense matrix that is mostly zeros can be compacted.
+
+# toDense( matrix ): Returns a Matrix holding the elements of a Matrix or SparseMatrix.
+
+# toSparse( matrix ): Returns a SparseMatrix holding the elements of a Matrix or SparseMatrix.
+
+# density( matrix ): Returns the fraction of non-zero elements of a Matrix or SparseMatrix.
+
+# compact( matrix, threshold ): Returns the matrix in the representation chosen by its density, converting it only if needed.
+
+# add( lhs, rhs, threshold ), subtract( lhs, rhs, threshold ), multiply( lhs, rhs, threshold ): Return lhs + rhs, lhs - rhs and lhs * rhs
+# for any combination of Matrix and SparseMatrix operands, in the representation chosen by the density of the result.
+
+# The + - * operators of a SparseMatrix with a Matrix operand (on either side) call these functions. Operators between two SparseMatrix
+# operands keep returning a SparseMatrix.
+
+import os
+import sys
+
+from SparseMatrix import SparseMatrix, MatrixSizeError
+
+# The dense Matrix ADT lives in Chapter_2.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chapter_2'))
+from MatrixADT import Matrix
+
+# Results with a larger fraction of non-zero elements are stored as a dense Matrix.
+DENSE_THRESHOLD = 0.25
+
+# Returns the matrix as a dense Matrix.
+def toDense( matrix ):
+    if not isinstance( matrix, SparseMatrix ) :
+        return matrix
+    newMatrix = Matrix( matrix.numRows(), matrix.numCols() )
+    for row, col, value in matrix._entries():
+        newMatrix[row, col] = value
+    return newMatrix
+
+# Returns the matrix as a SparseMatrix.
+def toSparse( matrix ):
+    if isinstance( matrix, SparseMatrix ) :
+        return matrix
+    return _sparseFromRows( matrix.numRows(), matrix.numCols(), _denseRows( matrix ) )
+
+# Returns the fraction of non-zero elements of the matrix.
+def density( matrix ):
+    size = matrix.numRows() * matrix.numCols()
+    if size == 0 :
+        return 0.0
+    if isinstance( matrix, SparseMatrix ) :
+        return matrix.numNonZeros() / size
+    return _countNonZeros( _denseRows( matrix ) ) / size
+
+# Returns the matrix in the representation chosen by its density.
+def compact( matrix, threshold = DENSE_THRESHOLD ):
+    if density( matrix ) > threshold :
+        return toDense( matrix )
+    return toSparse( matrix )
+
+# Returns lhs + rhs.
+def add( lhs, rhs, threshold = DENSE_THRESHOLD ):
+    return _combine( lhs, rhs, 1, threshold )
+
+# Returns lhs - rhs.
+def subtract( lhs, rhs, threshold = DENSE_THRESHOLD ):
+    return _combine( lhs, rhs, -1, threshold )
+
+# Returns lhs * rhs. Each row of the result is accumulated from the rows of rhs selected by the non-zero elements of the same row of
+# lhs, so zeros of lhs cost nothing whichever its representation.
+def multiply( lhs, rhs, threshold = DENSE_THRESHOLD ):
+    if lhs.numCols() != rhs.numRows() :
+        raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
+    if isinstance( lhs, SparseMatrix ) and isinstance( rhs, SparseMatrix ) :
+        return compact( lhs * rhs, threshold )
+
+    numCols = rhs.numCols()
+    rhsSparse = isinstance( rhs, SparseMatrix )
+    if rhsSparse :
+        rhsRows = [list( rhs._rows.get( k, {} ).items() ) for k in range( rhs.numRows() )]
+    else :
+        rhsRows = _denseRows( rhs )
+    if isinstance( lhs, SparseMatrix ) :
+        lhsRows = [list( lhs._rows.get( row, {} ).items() ) for row in range( lhs.numRows() )]
+    else :
+        lhsRows = [[(k, value) for k, value in enumerate( row ) if value != 0] for row in _denseRows( lhs )]
+
+    rows = list()
+    for lhsRow in lhsRows :
+        accumulator = [0] * numCols
+        for k, value in lhsRow :
+            if rhsSparse :
+                for col, rhsValue in rhsRows[k] :
+                    accumulator[col] += value * rhsValue
+            else :
+                accumulator = [acc + value * rhsValue for acc, rhsValue in zip( accumulator, rhsRows[k] )]
+        rows.append( accumulator )
+    return _fromRows( lhs.numRows(), numCols, rows, threshold )
+
+# Helper function used to add (sign = 1) or subtract (sign = -1) two matrices.
+def _combine( lhs, rhs, sign, threshold ):
+    if lhs.numRows() != rhs.numRows() or lhs.numCols() != rhs.numCols() :
+        raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
+    if isinstance( lhs, SparseMatrix ) and isinstance( rhs, SparseMatrix ) :
+        return compact( lhs + rhs if sign > 0 else lhs - rhs, threshold )
+
+    # At least one operand is dense: start from its rows and apply the elements of the other operand.
+    if not isinstance( lhs, SparseMatrix ) :
+        rows = _denseRows( lhs )
+        other, otherSign = rhs, sign
+    else :
+        rows = [[sign * value for value in row] for row in _denseRows( rhs )]
+        other, otherSign = lhs, 1
+    if isinstance( other, SparseMatrix ) :
+        for row, col, value in other._entries():
+            rows[row][col] += otherSign * value
+    else :
+        rows = [[value + otherSign * otherValue for value, otherValue in zip( row, otherRow )]
+                for row, otherRow in zip( rows, _denseRows( other ) )]
+    return _fromRows( lhs.numRows(), lhs.numCols(), rows, threshold )
+
+# Returns the elements of a dense matrix as a list of row lists.
+def _denseRows( matrix ):
+    numCols = matrix.numCols()
+    return [[matrix[row, col] for col in range( numCols )] for row in range( matrix.numRows() )]
+
+def _countNonZeros( rows ):
+    return sum( len( row ) - row.count( 0 ) for row in rows )
+
+# Returns a Matrix or SparseMatrix holding the row lists, chosen by their density.
+def _fromRows( numRows, numCols, rows, threshold ):
+    size = numRows * numCols
+    if size > 0 and _countNonZeros( rows ) / size > threshold :
+        newMatrix = Matrix( numRows, numCols )
+        for row, values in enumerate( rows ):
+            for col, value in enumerate( values ):
+                if value != 0 :
+                    newMatrix[row, col] = value
+        return newMatrix
+    return _sparseFromRows( numRows, numCols, rows )
+
+def _sparseFromRows( numRows, numCols, rows ):
+    newMatrix = SparseMatrix( numRows, numCols )
+    for row, values in enumerate( rows ):
+        rowDict = { col : value for col, value in enumerate( values ) if value != 0 }
+        if rowDict :
+            newMatrix._rows[row] = rowDict
+    return newMatrix
@@ -0,0 +1,138 @@
+# Reading and writing sparse matrices in the Matrix Market exchange format (.mtx). Only the coordinate format is supported: a header line
+# "%%MatrixMarket matrix coordinate <field> <symmetry>", optional comment lines starting with %, a size line "rows cols entries" and one
+# line per entry with its 1-based row and column indices followed by its value (no value for the pattern field).
+
+# readMatrixMarket( path, format ): Reads the file in chunks of lines and parses each chunk in bulk straight into typed coordinate arrays.
+# Symmetric, skew-symmetric and hermitian files are expanded to their full set of entries. The format selects the result: 'csr' (the
+# default) or 'csc' for a frozen CSRMatrix or CSCMatrix, 'coo' for the tuple (numRows, numCols, rows, cols, values).
+
+# writeMatrixMarket( matrix, path, field ): Writes a SparseMatrix, CSRMatrix or CSCMatrix as a general coordinate file with the entries in
+# row-major order. The field is 'integer', 'real' or 'complex', or None to choose it from the values.
+
+from array import array
+
+from SparseMatrix import CSRMatrix, CSCMatrix
+
+# The approximate number of bytes of the file parsed at a time.
+CHUNK_SIZE = 1 << 20
+
+# The number of entries written at a time.
+WRITE_BATCH = 4096
+
+# Reads a coordinate Matrix Market file.
+def readMatrixMarket( path, format = 'csr' ):
+    assert format in ('csr', 'csc', 'coo'), "Invalid matrix format."
+    with open( path ) as stream :
+        header = stream.readline().split()
+        assert len( header ) == 5 and header[0].lower() == '%%matrixmarket' and header[1].lower() == 'matrix', "Not a Matrix Market file."
+        layout, field, symmetry = header[2].lower(), header[3].lower(), header[4].lower()
+        assert layout == 'coordinate', "Only the coordinate format is supported."
+        assert field in ('real', 'double', 'integer', 'complex', 'pattern'), "Invalid Matrix Market field."
+        assert symmetry in ('general', 'symmetric', 'skew-symmetric', 'hermitian'), "Invalid Matrix Market symmetry."
+
+        # Skip the comments up to the size line.
+        line = stream.readline()
+        while line != '' and (line.startswith( '%' ) or not line.strip()) :
+            line = stream.readline()
+        assert line != '', "Not a Matrix Market file: the size line is missing."
+        numRows, numCols, numEntries = (int( token ) for token in line.split())
+
+        rows = array( 'q' )
+        cols = array( 'q' )
+        if field == 'integer' :
+            values = array( 'q' )
+        elif field == 'real' or field == 'double' :
+            values = array( 'd' )
+        else :
+            values = list()
+        step = {'pattern': 2, 'complex': 4}.get( field, 3 )
+
+        # Each chunk holds whole lines, so its tokens always start at an entry.
+        lines = stream.readlines( CHUNK_SIZE )
+        while lines :
+            tokens = ''.join( lines ).split()
+            rows.extend( map( int, tokens[0::step] ) )
+            cols.extend( map( int, tokens[1::step] ) )
+            if field == 'complex' :
+                values.extend( map( complex, map( float, tokens[2::step] ), map( float, tokens[3::step] ) ) )
+            elif field == 'integer' :
+                values.extend( map( int, tokens[2::step] ) )
+            elif field != 'pattern' :
+                values.extend( map( float, tokens[2::step] ) )
+            lines = stream.readlines( CHUNK_SIZE )
+    assert len( rows ) == numEntries, "The number of entries does not match the size line."
+
+    # Convert to 0-based indices.
+    rows = array( 'q', map( (-1).__add__, rows ) )
+    cols = array( 'q', map( (-1).__add__, cols ) )
+    if field == 'pattern' :
+        values = array( 'q', [1] ) * numEntries
+    if symmetry != 'general' :
+        _expandSymmetry( rows, cols, values, symmetry )
+
+    if format == 'coo' :
+        return numRows, numCols, rows, cols, values
+    elif format == 'csr' :
+        return CSRMatrix.from_coo( numRows, numCols, rows, cols, values )
+    else :
+        return CSCMatrix.from_coo( numRows, numCols, rows, cols, values )
+
+# Writes a matrix as a general coordinate Matrix Market file.
+def writeMatrixMarket( matrix, path, field = None ):
+    csr = matrix.to_csr()
+    indptr = csr.indptr()
+    indices = csr.indices()
+    data = csr.data()
+    if field is None :
+        field = _fieldOf( data )
+    assert field in ('integer', 'real', 'complex'), "Invalid Matrix Market field."
+    if field == 'complex' :
+        entryFormat = "%d %d %r %r\n"
+    elif field == 'real' :
+        entryFormat = "%d %d %r\n"
+    else :
+        entryFormat = "%d %d %d\n"
+
+    with open( path, 'w' ) as stream :
+        stream.write( "%%%%MatrixMarket matrix coordinate %s general\n" % field )
+        stream.write( "%d %d %d\n" % (csr.numRows(), csr.numCols(), csr.numNonZeros()) )
+        batch = list()
+        for row in range( csr.numRows() ):
+            for pos in range( indptr[row], indptr[row + 1] ):
+                value = data[pos]
+                if field == 'complex' :
+                    value = complex( value )
+                    batch.append( entryFormat % (row + 1, indices[pos] + 1, value.real, value.imag) )
+                elif field == 'real' :
+                    batch.append( entryFormat % (row + 1, indices[pos] + 1, float( value )) )
+                else :
+                    batch.append( entryFormat % (row + 1, indices[pos] + 1, value) )
+            if len( batch ) >= WRITE_BATCH :
+                stream.writelines( batch )
+                batch = list()
+        stream.writelines( batch )
+
+# Adds the mirrored entry of every off-diagonal entry of a symmetric, skew-symmetric or hermitian matrix.
+def _expandSymmetry( rows, cols, values, symmetry ):
+    for k in range( len( rows ) ):
+        row = rows[k]
+        col = cols[k]
+        if row != col :
+            value = values[k]
+            if symmetry == 'skew-symmetric' :
+                value = -value
+            elif symmetry == 'hermitian' :
+                value = value.conjugate()
+            rows.append( col )
+            cols.append( row )
+            values.append( value )
+
+# Chooses the Matrix Market field able to hold the values.
+def _fieldOf( data ):
+    if isinstance( data, array ) :
+        return 'integer' if data.typecode == 'q' else 'real'
+    if any( isinstance( value, complex ) for value in data ) :
+        return 'complex'
+    if all( isinstance( value, int ) for value in data ) :
+        return 'integer'
+    return 'real'
@@ -0,0 +1,282 @@
+# Parallel sparse matrix products. The rows of the left operand are split into contiguous partitions holding about the same number of
+# non-zero elements, and each partition is computed by a worker process. The operands are frozen into CSR format and copied once into
+# shared memory, so the workers read the typed arrays in place instead of receiving a pickled copy with every task.
+
+# ParallelProducts( numWorkers ): Creates a pool of numWorkers processes (default: one per CPU). With a single worker the products are
+# computed in the calling process. The pool should be closed, or used as a context manager.
+
+# matvec( A, x ): Returns the list A @ x for a SparseMatrix, CSRMatrix or CSCMatrix A and a sequence x of numCols() numbers. The workers
+# write their rows straight into a shared result array.
+
+# matmul( A, B ): Returns the product A * B of two sparse matrices as a CSRMatrix. Each worker returns the compressed rows of its
+# partition, which are concatenated in order.
+
+# close(): Shuts the pool down and releases the shared memory.
+
+# partitionRows( indptr, numParts ): Returns the numParts + 1 row boundaries splitting a CSR matrix into numParts partitions with about
+# the same number of non-zero elements.
+
+# Matrices whose values are not all int or float (e.g. Fraction) cannot be shared as typed arrays; their products are computed in the
+# calling process.
+
+import operator
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from SparseMatrix import CSRMatrix, MatrixSizeError, _dataArray
+
+# The number of frozen operands kept in shared memory between calls.
+SHARED_CACHE_SIZE = 4
+
+class ParallelProducts :
+    """
+    A pool of worker processes computing sparse matrix products.
+    """
+    def __init__( self, numWorkers = None ):
+        """
+        Creates the pool.
+
+        :param numWorkers: the number of worker processes, or None for one per CPU (min=1).
+        """
+        self._numWorkers = numWorkers if numWorkers is not None else os.cpu_count() or 1
+        assert self._numWorkers > 0, "The pool must have at least one worker."
+        self._executor = ProcessPoolExecutor( self._numWorkers ) if self._numWorkers > 1 else None
+        # The CSR operands copied into shared memory, most recent last: (matrix, shared arrays) pairs.
+        self._shared = list()
+
+    # Returns the number of worker processes.
+    def numWorkers( self ):
+        return self._numWorkers
+
+    # Multiplies a sparse matrix by a vector.
+    def matvec( self, A, x ):
+        """
+        Multiplies a sparse matrix by a vector: y = A @ x.
+
+        :param A: a SparseMatrix, CSRMatrix or CSCMatrix.
+        :param x: a sequence of A.numCols() numbers.
+        :return: the list of A.numRows() values.
+        """
+        if len( x ) != A.numCols() :
+            raise MatrixSizeError( "Vector size not compatible for the operation." )
+        csr = A.to_csr()
+        vector = _dataArray( list( x ) )
+        if self._executor is None or not _isTyped( csr.data() ) or not _isTyped( vector ) :
+            return _matvecRows( csr.indptr(), csr.indices(), csr.data(), vector, 0, csr.numRows() )
+
+        typecode = 'q' if csr.data().typecode == 'q' and vector.typecode == 'q' else 'd'
+        shared = self._share( csr )
+        vectorBlock = _SharedArray( vector )
+        result = _SharedArray( array( typecode ), csr.numRows() )
+        try :
+            bounds = partitionRows( csr.indptr(), self._numWorkers )
+            tasks = [self._executor.submit( _matvecTask, shared, vectorBlock.handle(), result.handle(), bounds[k], bounds[k + 1] )
+                     for k in range( len( bounds ) - 1 ) if bounds[k] < bounds[k + 1]]
+            for task in tasks :
+                task.result()
+            return result.tolist()
+        finally :
+            vectorBlock.release()
+            result.release()
+
+    # Multiplies two sparse matrices.
+    def matmul( self, A, B ):
+        """
+        Multiplies two sparse matrices: C = A * B.
+
+        :param A: a SparseMatrix, CSRMatrix or CSCMatrix.
+        :param B: a SparseMatrix, CSRMatrix or CSCMatrix with A.numCols() rows.
+        :return: the product as a CSRMatrix.
+        """
+        if A.numCols() != B.numRows() :
+            raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
+        lhs = A.to_csr()
+        rhs = B.to_csr()
+        if self._executor is None or not _isTyped( lhs.data() ) or not _isTyped( rhs.data() ) :
+            counts, indices, data = _matmulRows( lhs.indptr(), lhs.indices(), lhs.data(),
+                                                 rhs.indptr(), rhs.indices(), rhs.data(), 0, lhs.numRows() )
+            return _stitch( lhs.numRows(), rhs.numCols(), [(counts, indices, data)] )
+
+        lhsShared = self._share( lhs )
+        rhsShared = self._share( rhs )
+        bounds = partitionRows( lhs.indptr(), self._numWorkers )
+        tasks = [self._executor.submit( _matmulTask, lhsShared, rhsShared, bounds[k], bounds[k + 1] )
+                 for k in range( len( bounds ) - 1 ) if bounds[k] < bounds[k + 1]]
+        return _stitch( lhs.numRows(), rhs.numCols(), [task.result() for task in tasks] )
+
+    # Shuts the pool down and releases the shared memory.
+    def close( self ):
+        """
+        Shuts the pool down and releases the shared memory.
+        """
+        if self._executor is not None :
+            self._executor.shutdown()
+            self._executor = None
+        while self._shared :
+            _releaseAll( self._shared.pop()[1] )
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *excInfo ):
+        self.close()
+
+    # Returns the handles of the shared copies of the arrays of the CSR matrix, copying them on first use. Frozen matrices
+    # cannot change, so the copies are reused while the matrix is among the most recently used operands.
+    def _share( self, csr ):
+        for pos, (matrix, blocks) in enumerate( self._shared ) :
+            if matrix is csr :
+                self._shared.append( self._shared.pop( pos ) )
+                return [block.handle() for block in blocks]
+
+        blocks = [_SharedArray( csr.indptr() ), _SharedArray( csr.indices() ), _SharedArray( csr.data() )]
+        self._shared.append( (csr, blocks) )
+        if len( self._shared ) > SHARED_CACHE_SIZE :
+            _releaseAll( self._shared.pop( 0 )[1] )
+        return [block.handle() for block in blocks]
+
+# Multiplies a sparse matrix by a vector using a temporary pool.
+def parallelMatVec( A, x, numWorkers = None ):
+    with ParallelProducts( numWorkers ) as pool :
+        return pool.matvec( A, x )
+
+# Multiplies two sparse matrices using a temporary pool.
+def parallelMatMul( A, B, numWorkers = None ):
+    with ParallelProducts( numWorkers ) as pool :
+        return pool.matmul( A, B )
+
+# Returns the row boundaries of numParts partitions of about nnz / numParts elements each: partition k holds the rows bounds[k] to
+# bounds[k + 1] - 1. A row is never split, so a partition may be empty when a single row holds many elements.
+def partitionRows( indptr, numParts ):
+    assert numParts > 0, "There must be at least one partition."
+    numRows = len( indptr ) - 1
+    numNonZeros = indptr[numRows]
+    bounds = [0]
+    for k in range( 1, numParts ):
+        target = (numNonZeros * k + numParts - 1) // numParts
+        bounds.append( max( bounds[-1], min( numRows, bisect_left( indptr, target ) ) ) )
+    bounds.append( numRows )
+    return bounds
+
+# Returns True if the values are stored in a typed array that can be shared.
+def _isTyped( values ):
+    return isinstance( values, array )
+
+# Computes rows start to end - 1 of A @ x.
+def _matvecRows( indptr, indices, data, x, start, end ):
+    getValue = x.__getitem__
+    result = [0] * (end - start)
+    rowStart = indptr[start]
+    for row in range( start, end ):
+        rowEnd = indptr[row + 1]
+        if rowEnd > rowStart :
+            result[row - start] = sum( map( operator.mul, data[rowStart:rowEnd], map( getValue, indices[rowStart:rowEnd] ) ) )
+        rowStart = rowEnd
+    return result
+
+# Computes rows start to end - 1 of A * B with Gustavson's algorithm. Returns the number of elements of each row and the column
+# indices (in increasing order within a row) and values of the elements.
+def _matmulRows( indptr, indices, data, rhsIndptr, rhsIndices, rhsData, start, end ):
+    counts = array( 'q' )
+    newIndices = array( 'q' )
+    newData = list()
+    for row in range( start, end ):
+        accumulator = dict()
+        for pos in range( indptr[row], indptr[row + 1] ):
+            value = data[pos]
+            k = indices[pos]
+            for rhsPos in range( rhsIndptr[k], rhsIndptr[k + 1] ):
+                col = rhsIndices[rhsPos]
+                accumulator[col] = accumulator.get( col, 0 ) + value * rhsData[rhsPos]
+
+        # Products that cancelled out are not stored.
+        numCols = len( newIndices )
+        for col in sorted( accumulator ):
+            value = accumulator[col]
+            if value != 0 :
+                newIndices.append( col )
+                newData.append( value )
+        counts.append( len( newIndices ) - numCols )
+    return counts, newIndices, newData
+
+# Concatenates the compressed rows of consecutive partitions into a CSR matrix.
+def _stitch( numRows, numCols, parts ):
+    indptr = array( 'q', [0] )
+    indices = array( 'q' )
+    data = list()
+    for counts, partIndices, partData in parts :
+        for count in counts :
+            indptr.append( indptr[-1] + count )
+        indices.extend( partIndices )
+        data.extend( partData )
+    # Rows after the last non-empty partition hold no elements.
+    indptr.extend( [indptr[-1]] * (numRows + 1 - len( indptr )) )
+    return CSRMatrix( numRows, numCols, indptr, indices, _dataArray( data ) )
+
+def _releaseAll( blocks ):
+    for block in blocks :
+        block.release()
+
+# The worker task computing rows start to end - 1 of A @ x into the shared result.
+def _matvecTask( matrix, vector, result, start, end ):
+    views = [_SharedView( handle ) for handle in matrix + [vector, result]]
+    try :
+        indptr, indices, data, x, y = (view.array for view in views)
+        y[start:end] = array( y.format, _matvecRows( indptr, indices, data, x, start, end ) )
+    finally :
+        for view in views :
+            view.close()
+
+# The worker task computing rows start to end - 1 of A * B. Returns the compressed rows.
+def _matmulTask( lhs, rhs, start, end ):
+    views = [_SharedView( handle ) for handle in lhs + rhs]
+    try :
+        return _matmulRows( *(view.array for view in views), start, end )
+    finally :
+        for view in views :
+            view.close()
+
+# A typed array copied into a block of shared memory, owned by the parent process.
+class _SharedArray :
+    def __init__( self, values, length = None ):
+        self._typecode = values.typecode
+        self._length = len( values ) if length is None else length
+        numBytes = self._length * values.itemsize
+        # Shared memory blocks cannot be empty.
+        self._block = SharedMemory( create = True, size = max( numBytes, 1 ) )
+        if length is None :
+            self._block.buf[:numBytes] = values.tobytes()
+
+    # Returns the picklable (name, typecode, length) handle the workers attach with.
+    def handle( self ):
+        return (self._block.name, self._typecode, self._length)
+
+    def tolist( self ):
+        view = _SharedView( self.handle(), self._block )
+        try :
+            return view.array.tolist()
+        finally :
+            view.close()
+
+    def release( self ):
+        self._block.close()
+        self._block.unlink()
+
+# A typed memoryview over a shared array, attached by its handle.
+class _SharedView :
+    def __init__( self, handle, block = None ):
+        name, typecode, length = handle
+        self._attached = block is None
+        self._block = SharedMemory( name = name ) if block is None else block
+        self._bytes = self._block.buf[:length * array( typecode ).itemsize]
+        self.array = self._bytes.cast( typecode )
+
+    # The views must be released before the block can be closed.
+    def close( self ):
+        self.array.release()
+        self._bytes.release()
+        if self._attached :
+            self._block.close()
@@ -0,0 +1,103 @@
+# SparseBenchmark.py
+# Scaling benchmark of the parallel sparse products. A synthetic square matrix whose row lengths follow a power law (a few very long rows
+# and many short ones) is multiplied by a vector and by itself with 1 to N worker processes. The time of each product, the speedup over
+# a single worker and the balance of the row partitions are reported as JSON.
+#
+# Usage: python SparseBenchmark.py [--size N] [--avg-nnz N] [--alpha A] [--workers N] [--repeat N] [--seed N] [--output path]
+import argparse
+import json
+import os
+import platform
+import random
+import time
+
+from ParallelSparse import ParallelProducts, partitionRows
+from SparseMatrix import CSRMatrix
+
+# Default parameters.
+MATRIX_SIZE = 4000
+AVG_NNZ = 12
+ALPHA = 2.0
+REPEAT = 5
+SEED = 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scaling of the parallel sparse products.')
+    parser.add_argument('--size', type=int, default=MATRIX_SIZE, help='rows and columns of the matrix')
+    parser.add_argument('--avg-nnz', type=float, default=AVG_NNZ, help='mean number of non-zero elements per row')
+    parser.add_argument('--alpha', type=float, default=ALPHA, help='exponent of the power law of the row lengths (> 1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='largest number of worker processes')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='number of timed runs of each product; the median is reported')
+    parser.add_argument('--seed', type=int, default=SEED, help='seed of the random matrix')
+    parser.add_argument('--output', help='write the JSON report to this file instead of standard output')
+    args = parser.parse_args()
+    assert args.size > 0 and args.workers > 0 and args.repeat > 0, "The size, workers and repeat must be > 0."
+    assert args.alpha > 1, "The power law exponent must be > 1."
+
+    rng = random.Random(args.seed)
+    matrix = powerLawMatrix(args.size, args.avg_nnz, args.alpha, rng)
+    vector = [rng.random() for i in range(args.size)]
+    results = [runWorkers(matrix, vector, numWorkers, args.repeat) for numWorkers in range(1, args.workers + 1)]
+    for result in results:
+        for product in ('matvec', 'matmul'):
+            result[product]['speedup'] = results[0][product]['seconds'] / result[product]['seconds']
+
+    report = {
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'size': args.size,
+        'nonZeros': matrix.numNonZeros(),
+        'longestRow': max(matrix.indptr()[i + 1] - matrix.indptr()[i] for i in range(args.size)),
+        'alpha': args.alpha,
+        'seed': args.seed,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as stream:
+            stream.write(text + '\n')
+    else:
+        print(text)
+
+def powerLawMatrix(size, avgNonZeros, alpha, rng):
+    # Row lengths are drawn from a Pareto distribution scaled to the requested mean, with the columns chosen uniformly.
+    scale = avgNonZeros * (alpha - 1) / alpha
+    rows, cols, values = [], [], []
+    for row in range(size):
+        length = min(size, max(1, int(scale * rng.paretovariate(alpha))))
+        rows.extend([row] * length)
+        cols.extend(rng.sample(range(size), length))
+        values.extend(rng.random() for i in range(length))
+    return CSRMatrix.from_coo(size, size, rows, cols, values)
+
+def runWorkers(matrix, vector, numWorkers, repeat):
+    # Each product is run once untimed, which starts the workers and copies the matrix into shared memory.
+    with ParallelProducts(numWorkers) as pool:
+        pool.matvec(matrix, vector)
+        matvecSeconds = timeMedian(lambda: pool.matvec(matrix, vector), repeat)
+        pool.matmul(matrix, matrix)
+        matmulSeconds = timeMedian(lambda: pool.matmul(matrix, matrix), repeat)
+
+    indptr = matrix.indptr()
+    bounds = partitionRows(indptr, numWorkers)
+    partSizes = [indptr[bounds[k + 1]] - indptr[bounds[k]] for k in range(numWorkers)]
+    return {
+        'workers': numWorkers,
+        'partitionNonZeros': partSizes,
+        'imbalance': max(partSizes) * numWorkers / max(1, sum(partSizes)),
+        'matvec': {'seconds': matvecSeconds},
+        'matmul': {'seconds': matmulSeconds},
+    }
+
+def timeMedian(run, repeat):
+    # Returns the median time of the runs in seconds.
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+if __name__ == '__main__':
+    main()
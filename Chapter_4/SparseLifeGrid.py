@@ -24,20 +24,49 @@
 # numLiveNeighbors( row, col ): Returns the number of live neighbors for the given cell (row, col). The neighbors of a cell include all of the cells immediately surrounding it in all directions. For the cells along the border
 # of the grid, the neighbors that fall outside the grid are assumed to be dead. The cell indices must be within the valid range of the grid.
 
+# stateHash(): Returns a Zobrist-style hash of the set of live cells, maintained incrementally as cells are set and cleared.
+
+# snapshot( path, generation ): Saves the live cells and the generation number to the file at path in a compact binary format: the sorted
+# coordinates are delta encoded as variable-length integers. The file is replaced atomically.
+
+# restore( path ): Configures the grid from the snapshot file at path and returns the generation number stored in it.
+
+# captureState() / writeSnapshot( state, path, generation ): Split snapshot() in two, so a copy of the live cells can be taken between two
+# generations while the encoding and writing happen elsewhere, as done by the background checkpointer.
+
+import os
+import struct
+import sys
+
+# The cell keys of the state hash and the snapshot file writer are shared with the dense LifeGrid in Chapter_2.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chapter_2'))
+from LifeCheckpoint import replaceFile
+from LifeGrid import cellKey
+
+# The snapshot header: magic, generation number and number of live cells.
+_SNAPSHOT_HEADER = struct.Struct('<4sQQ')
+_SNAPSHOT_MAGIC = b'SLG1'
+
 class SparseLifeGrid:
     """
     Implements the Game of Life grid using a sparse matrix approach.
     
     Attributes:
         _grid (dict): A dictionary representing the grid, where keys are tuples (row, col) of live cells.
+        _rowCells (dict): Maps each occupied row index to the set of live column indices in that row.
+        _colCounts (dict): Maps each occupied column index to the number of live cells in that column.
         _minrow (int): The minimum row index currently occupied by a live cell.
         _maxrow (int): The maximum row index currently occupied by a live cell.
         _mincol (int): The minimum column index currently occupied by a live cell.
         _maxcol (int): The maximum column index currently occupied by a live cell.
+        _hash (int): The XOR of the keys of all live cells.
     """
     
     def __init__(self):
         self._grid = {}
+        self._rowCells = {}
+        self._colCounts = {}
+        self._hash = 0
         self._minrow = self._maxrow = None
         self._mincol = self._maxcol = None
     
@@ -57,43 +86,57 @@ class SparseLifeGrid:
             coordList (list): A list of tuples representing the coordinates of live cells.
         """
         self._grid.clear()
-        self._minrow = self._maxrow = None
-        self._mincol = self._maxcol = None
-    
-    def minRange(self):
-        """Returns a 2-tuple (minrow, mincol) that contains the minimum row and column indices currently occupied by a live cell."""
-        return (self._minrow, self._mincol)
-    
-    def maxRange(self):
-        """Returns a 2-tuple (maxrow, maxcol) that contains the maximum row and column indices currently occupied by a live cell."""
-        return (self._maxrow, self._maxcol)
-    
-    def configure(self, coordList):
-        """
-        Configures the grid for evolving the first generation. The coordList argument is a sequence of 2-tuples with each tuple representing the coordinates (row, col) of the cells to be set as alive. All remaining cells are cleared or set to dead.
-        
-        Args:
-            coordList (list): A list of tuples representing the coordinates of live cells.
-        """
-        self._grid.clear()
+        self._rowCells.clear()
+        self._colCounts.clear()
+        self._hash = 0
         self._minrow = self._maxrow = None
         self._mincol = self._maxcol = None
         for row, col in coordList:
             self.setCell(row, col)
 
     def clearCell(self, row, col):
-        """Clears the individual cell (row, col) and sets it to dead."""
-        try:
-            del self._grid[(row, col)]
-            if not self._grid:
-                self._minrow = self._maxrow = None
-                self._mincol = self._maxcol = None
-        except KeyError:
-            pass
+        """
+        Clears the individual cell (row, col) and sets it to dead.
+
+        The bounding box is shrunk whenever the last live cell of a boundary row or column is cleared, so
+        minRange() and maxRange() always describe the tightest box around the live cells.
+        """
+        if (row, col) not in self._grid:
+            return
+        del self._grid[(row, col)]
+        self._hash ^= cellKey(row, col)
+        if not self._grid:
+            self._rowCells.clear()
+            self._colCounts.clear()
+            self._minrow = self._maxrow = None
+            self._mincol = self._maxcol = None
+            return
+
+        rowCells = self._rowCells[row]
+        rowCells.discard(col)
+        if not rowCells:
+            del self._rowCells[row]
+            if row == self._minrow:
+                self._minrow = _nearestOccupied(self._rowCells, self._minrow, self._maxrow, 1)
+            elif row == self._maxrow:
+                self._maxrow = _nearestOccupied(self._rowCells, self._maxrow, self._minrow, -1)
+        if _decrement(self._colCounts, col):
+            if col == self._mincol:
+                self._mincol = _nearestOccupied(self._colCounts, self._mincol, self._maxcol, 1)
+            elif col == self._maxcol:
+                self._maxcol = _nearestOccupied(self._colCounts, self._maxcol, self._mincol, -1)
 
     def setCell(self, row, col):
         """Sets the indicated cell (row, col) to be alive."""
+        if (row, col) in self._grid:
+            return
         self._grid[(row, col)] = True
+        self._hash ^= cellKey(row, col)
+        if row in self._rowCells:
+            self._rowCells[row].add(col)
+        else:
+            self._rowCells[row] = {col}
+        self._colCounts[col] = self._colCounts.get(col, 0) + 1
         if self._minrow is None or row < self._minrow:
             self._minrow = row
         if self._maxrow is None or row > self._maxrow:
@@ -107,6 +150,18 @@ class SparseLifeGrid:
         """Returns a boolean value indicating if the given cell (row, col) contains a live organism."""
         return (row, col) in self._grid
 
+    def liveColumns(self, row):
+        """Returns the sorted list of the column indices of the live cells in the given row."""
+        return sorted(self._rowCells.get(row, ()))
+
+    def stateHash(self):
+        """
+        Returns the hash of the set of live cells.
+
+        Each cell's key is given by LifeGrid's cellKey(), so equal live sets hash equally in both backends.
+        """
+        return self._hash
+
     def numLiveNeighbors(self, row, col):
         """
         Returns the number of live neighbors for the given cell (row, col).
@@ -115,16 +170,124 @@ class SparseLifeGrid:
         """
         return sum(self.isLiveCell(row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr != 0 or dc != 0))
 
+    def snapshot(self, path, generation=0):
+        """
+        Saves the live cells of the grid to a snapshot file.
+
+        Args:
+            path (str): The file to write.
+            generation (int): The generation number stored with the cells.
+        """
+        SparseLifeGrid.writeSnapshot(self.captureState(), path, generation)
+
+    def restore(self, path):
+        """
+        Configures the grid from a snapshot file.
+
+        Args:
+            path (str): The file to read.
+
+        Returns:
+            int: The generation number stored in the snapshot.
+        """
+        with open(path, 'rb') as stream:
+            data = stream.read()
+        magic, generation, count = _SNAPSHOT_HEADER.unpack_from(data)
+        assert magic == _SNAPSHOT_MAGIC, "Not a SparseLifeGrid snapshot."
+
+        self.configure([])
+        pos = _SNAPSHOT_HEADER.size
+        row = col = 0
+        for i in range(count):
+            dr, pos = _getVarint(data, pos)
+            dc, pos = _getVarint(data, pos)
+            if dr != 0:
+                row += dr
+                col = 0
+            col += dc
+            self.setCell(row, col)
+        return generation
+
+    def captureState(self):
+        """Returns an immutable copy of the live cells, to be passed to writeSnapshot()."""
+        return tuple(self._grid)
+
+    @staticmethod
+    def writeSnapshot(state, path, generation=0):
+        """
+        Encodes the cells captured by captureState() and writes them to a snapshot file.
+
+        Each cell is stored as the row delta from the previous cell followed by the column delta, which is taken
+        from column 0 whenever the row changes. Both are zigzag encoded varints, so dense rows cost about two bytes
+        per cell.
+        """
+        data = bytearray(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, generation, len(state)))
+        prevRow = prevCol = 0
+        for row, col in sorted(state):
+            if row != prevRow:
+                prevCol = 0
+            _putVarint(data, row - prevRow)
+            _putVarint(data, col - prevCol)
+            prevRow, prevCol = row, col
+        replaceFile(path, data)
+
     def __str__(self):
         """Returns a string representation of the grid."""
+        if self._minrow is None:
+            return ''
+        width = self._maxcol - self._mincol + 1
+        live = ord('@')
         lines = []
         for row in range(self._minrow, self._maxrow + 1):
-            line = ''.join('@' if self.isLiveCell(row, col) else '.' for col in range(self._mincol, self._maxcol + 1))
-            lines.append(line)
+            line = bytearray(b'.' * width)
+            for col in self._rowCells.get(row, ()):
+                line[col - self._mincol] = live
+            lines.append(line.decode('ascii'))
         return '\n'.join(lines)
     
     def __repr__(self):
         return 'Grid(%s)' % repr(self._grid)
+
+# Decrements the occupancy count stored for ndx, dropping the entry when it reaches zero. Returns True if
+# the column became empty.
+def _decrement(counts, ndx):
+    if counts[ndx] == 1:
+        del counts[ndx]
+        return True
+    counts[ndx] -= 1
+    return False
+
+# Finds the occupied row or column index nearest to the emptied boundary index, moving in the direction
+# of step towards the opposite boundary. Only the keys of counts (_rowCells or _colCounts) are used. Walks
+# the gap when it is narrow and otherwise takes the min/max of the occupied indices, so the cost is bounded
+# by the smaller of the two.
+def _nearestOccupied(counts, start, stop, step):
+    if abs(stop - start) <= len(counts):
+        ndx = start + step
+        while ndx not in counts:
+            ndx += step
+        return ndx
+    return min(counts) if step > 0 else max(counts)
+
+# Appends the signed integer value to data as a zigzag encoded varint.
+def _putVarint(data, value):
+    value = (value << 1) if value >= 0 else ((-value << 1) - 1)
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+
+# Reads a zigzag encoded varint from data at pos. Returns the value and the position following it.
+def _getVarint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return ((value >> 1) if not value & 1 else -((value + 1) >> 1)), pos
     
 # Test Code
 if __name__ == '__main__':
@@ -156,4 +319,11 @@ if __name__ == '__main__':
     # Configure the grid for the next generation
     grid.configure(next_generation)
     print("\nAfter one generation:")
-    print(grid)
\ No newline at end of file
+    print(grid)
+
+    # Cells in rows and columns -1 and -2 must not cancel out in the state hash.
+    grid = SparseLifeGrid()
+    grid.configure([(-1, -2), (-1, -1)])
+    assert grid.stateHash() != SparseLifeGrid().stateHash(), "Cells at -1 and -2 cancel out in the state hash."
+    grid.configure([(-2, 0), (-1, 0)])
+    assert grid.stateHash() != SparseLifeGrid().stateHash(), "Cells at -1 and -2 cancel out in the state hash."
\ No newline at end of file
@@ -1,10 +1,17 @@
-# Implementation of the Sparse Matrix ADT using a list.
+# Implementation of the Sparse Matrix ADT using a dictionary of rows, each mapping the column indices to the non-zero values.
+# A matrix can be frozen into the compressed sparse row (CSR) or column (CSC) format, which stores the non-zero elements in typed
+# arrays and provides a fast matrix-vector product for iterative work over large matrices. Matrices can be assembled in bulk from the
+# coordinate (COO) format, transposed and sliced by rows and columns.
+import operator
+from array import array
+from bisect import bisect_left
+
 class SparseMatrix :
     # Create a sparse matrix of size numRows x numCols initialized to 0.
     def __init__( self, numRows, numCols ):
         self._numRows = numRows
         self._numCols = numCols
-        self._elementList = list()
+        self._rows = dict()
 
     # Return the number of rows in the matrix.
     def numRows( self ):
@@ -20,102 +27,134 @@ class SparseMatrix :
         row = ndxTuple[0]
         col = ndxTuple[1]
         assert row >= 0 and row < self.numRows() and col >= 0 and col < self.numCols(), "Array subscripts out of range."
-        for element in self._elementList:
-            if element.row == row and element.col == col:
-                return element.value
-        return 0
-
+        rowDict = self._rows.get( row )
+        if rowDict is None :
+            return 0
+        return rowDict.get( col, 0 )
 
     # Set the value of element (i,j) to the value s: x[i,j] = s
     def __setitem__( self, ndxTuple, scalar ):
-        ndx = self._findPosition( ndxTuple[0], ndxTuple[1] )
-        if ndx is not None :
-            if scalar != 0.0 :
-                self._elementList[ndx].value = scalar
+        assert len(ndxTuple) == 2, "Invalid number of array subscripts."
+        row = ndxTuple[0]
+        col = ndxTuple[1]
+        assert row >= 0 and row < self.numRows() and col >= 0 and col < self.numCols(), "Array subscripts out of range."
+        rowDict = self._rows.get( row )
+        if scalar != 0.0 :
+            if rowDict is None :
+                self._rows[row] = { col : scalar }
             else :
-                self._elementList.pop( ndx )
-        else :
-            if scalar != 0.0 :
-                element = _MatrixElement( ndxTuple[0], ndxTuple[1], scalar )
-                self._elementList.append( element )
+                rowDict[col] = scalar
+        elif rowDict is not None and col in rowDict :
+            # Zero elements are not stored, and neither are empty rows.
+            del rowDict[col]
+            if not rowDict :
+                del self._rows[row]
+
+    # Return the number of non-zero elements stored in the matrix.
+    def numNonZeros( self ):
+        return sum( len( rowDict ) for rowDict in self._rows.values() )
 
-    # Scale the matrix by the given scalar.
+    # Scale the matrix by the given scalar. Elements that become zero (all of them for a zero scalar) are no longer stored.
     def scaleBy( self, scalar ):
-        for element in self._elementList :
-            element.value *= scalar
+        for row in list( self._rows ):
+            rowDict = { col : value * scalar for col, value in self._rows[row].items() if value * scalar != 0 }
+            if rowDict :
+                self._rows[row] = rowDict
+            else :
+                del self._rows[row]
 
     # The additional dunder methods
+    # Sums, differences and products with a dense Matrix operand are computed by MatrixDispatch, which is imported on first
+    # use since it depends on this module.
     def __add__( self, rhsMatrix ):
+        if not isinstance( rhsMatrix, SparseMatrix ):
+            import MatrixDispatch
+            return MatrixDispatch.add( self, rhsMatrix )
         if self.numRows() != rhsMatrix.numRows() or self.numCols() != rhsMatrix.numCols():
             raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
         else:
-            newMatrix = SparseMatrix( self.numRows(), self.numCols() )
-            for element in self._elementList:
-                newMatrix[element.row, element.col] = element.value
-            for element in rhsMatrix._elementList:
-                newMatrix[element.row, element.col] += element.value
-            return newMatrix
+            return self._combine( rhsMatrix, operator.add )
 
     def __sub__( self, rhsMatrix ):
+        if not isinstance( rhsMatrix, SparseMatrix ):
+            import MatrixDispatch
+            return MatrixDispatch.subtract( self, rhsMatrix )
         if self.numRows() != rhsMatrix.numRows() or self.numCols() != rhsMatrix.numCols():
             raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
         else:
-            newMatrix = SparseMatrix( self.numRows(), self.numCols() )
-            for element in self._elementList:
-                newMatrix[element.row, element.col] = element.value
-            for element in rhsMatrix._elementList:
-                newMatrix[element.row, element.col] -= element.value
-            return newMatrix
+            return self._combine( rhsMatrix, operator.sub )
         
     def __mul__( self, rhsMatrix ):
+        if not isinstance( rhsMatrix, SparseMatrix ):
+            import MatrixDispatch
+            return MatrixDispatch.multiply( self, rhsMatrix )
         if self.numCols() != rhsMatrix.numRows():
             raise MatrixSizeError( "Matrix sizes not compatible for the operation." )
         else:
+            # Gustavson's algorithm: each row of the result is accumulated from the rows of rhsMatrix selected by the
+            # non-zero columns of the same row of self, so the work is proportional to the multiplications performed.
             newMatrix = SparseMatrix( self.numRows(), rhsMatrix.numCols() )
-            for element in self._elementList:
-                for element2 in rhsMatrix._elementList:
-                    if element.col == element2.row:
-                        newMatrix[element.row, element2.col] += element.value * element2.value
+            rhsRows = rhsMatrix._rows
+            for row, rowDict in self._rows.items() :
+                accumulator = dict()
+                for k, value in rowDict.items() :
+                    rhsRow = rhsRows.get( k )
+                    if rhsRow is not None :
+                        for col, rhsValue in rhsRow.items() :
+                            accumulator[col] = accumulator.get( col, 0 ) + value * rhsValue
+
+                # Products that cancelled out are not stored.
+                newRow = { col : value for col, value in accumulator.items() if value != 0 }
+                if newRow :
+                    newMatrix._rows[row] = newRow
             return newMatrix
         
+    def __radd__( self, lhsMatrix ):
+        import MatrixDispatch
+        return MatrixDispatch.add( lhsMatrix, self )
+
+    def __rsub__( self, lhsMatrix ):
+        import MatrixDispatch
+        return MatrixDispatch.subtract( lhsMatrix, self )
+
     def __rmul__( self, scalar ):
+        if hasattr( scalar, 'numCols' ):
+            import MatrixDispatch
+            return MatrixDispatch.multiply( scalar, self )
         newMatrix = SparseMatrix( self.numRows(), self.numCols() )
-        for element in self._elementList:
-            newMatrix[element.row, element.col] = element.value * scalar
+        for row, col, value in self._entries():
+            newMatrix[row, col] = value * scalar
         return newMatrix
     
     def __eq__( self, rhsMatrix ):
-        # Check if the sizes of the matrices are equal
-        if self.numRows() != rhsMatrix.numRows() or self.numCols() != rhsMatrix.numCols():
-            return False
-        
-        # Compare elements of the matrices
-        for element in self._elementList:
-            try:
-                # Attempt to access the corresponding element in rhsMatrix
-                # Note: This assumes __getitem__ is correctly implemented
-                rhsValue = rhsMatrix[element.row, element.col]
-            except AssertionError:
-                # If accessing rhsMatrix raises an assertion error, it means the indices are out of range,
-                # which should not happen if both matrices have the same size. So, we return False.
-                return False
-            
-            # Compare the value of the element in self with the value in rhsMatrix
-            if element.value != rhsValue:
-                return False
-        
-        # If all elements match and the sizes are the same, the matrices are equal
-        return True
-        
+        return self.equals( rhsMatrix )
+
     def __ne__( self, rhsMatrix ):
+        return not self.equals( rhsMatrix )
+
+    # Return True if the matrix has the same size and elements as rhsMatrix (a SparseMatrix, CSRMatrix, CSCMatrix or Matrix), with
+    # the elements differing by at most tol. The stored elements of both matrices are compared row by row in O(nnz).
+    def equals( self, rhsMatrix, tol = 0 ):
         if self.numRows() != rhsMatrix.numRows() or self.numCols() != rhsMatrix.numCols():
-            return True
-        else:
-            for element in self._elementList:
-                if element.row != rhsMatrix[element.row, element.col].row or element.col != rhsMatrix[element.row, element.col].col or \
-                element.value != rhsMatrix[element.row, element.col].value:
-                    return True
             return False
+        if not isinstance( rhsMatrix, SparseMatrix ):
+            if hasattr( rhsMatrix, 'to_sparse' ):
+                rhsMatrix = rhsMatrix.to_sparse()
+            else :
+                import MatrixDispatch
+                rhsMatrix = MatrixDispatch.toSparse( rhsMatrix )
+        if tol == 0 :
+            return self._rows == rhsMatrix._rows
+
+        # An element stored in one matrix only is compared with zero.
+        rhsRows = rhsMatrix._rows
+        for row in self._rows.keys() | rhsRows.keys() :
+            rowDict = self._rows.get( row, {} )
+            rhsRow = rhsRows.get( row, {} )
+            for col in rowDict.keys() | rhsRow.keys() :
+                if abs( rowDict.get( col, 0 ) - rhsRow.get( col, 0 ) ) > tol :
+                    return False
+        return True
         
     def add( self, rhsMatrix ):
         return self + rhsMatrix
@@ -126,21 +165,127 @@ class SparseMatrix :
     def multiply( self, rhsMatrix ):
         return self * rhsMatrix
 
-    # Helper method used to find a specific matrix element (row,col) in the list of non-zero entries. None is returned if the element is not found.
-    def _findPosition( self, row, col ):
-        n = len( self._elementList )
-        for i in range( n ) :
-            if row == self._elementList[i].row and col == self._elementList[i].col:
-                return i
-        return None
+    # Multiply the matrix by a vector given as a sequence of numCols() values: y = A @ x. Returns the list of numRows() values.
+    def __matmul__( self, vector ):
+        if len( vector ) != self.numCols():
+            raise MatrixSizeError( "Vector size not compatible for the operation." )
+        result = [0] * self.numRows()
+        for row, rowDict in self._rows.items() :
+            result[row] = sum( value * vector[col] for col, value in rowDict.items() )
+        return result
 
+    # Return a frozen copy of the matrix in compressed sparse row format.
+    def to_csr( self ):
+        return CSRMatrix( self._numRows, self._numCols, *_compress( self._numRows, self._rows ) )
 
-# Storage class for holding the non-zero matrix elements.
-class _MatrixElement:
-    def __init__( self, row, col, value ):
-        self.row = row
-        self.col = col
-        self.value = value
+    # Return a frozen copy of the matrix in compressed sparse column format.
+    def to_csc( self ):
+        return CSCMatrix( self._numRows, self._numCols, *_compress( self._numCols, self.transpose()._rows ) )
+
+    # Create a matrix from the coordinate (COO) format: the element k is at (rows[k], cols[k]) and has the value values[k].
+    # The coordinates may come in any order; the values of repeated coordinates are summed, and sums of zero are not stored.
+    @classmethod
+    def from_coo( cls, numRows, numCols, rows, cols, values ):
+        assert len( rows ) == len( cols ) == len( values ), "The coordinate arrays must have the same length."
+        newMatrix = cls( numRows, numCols )
+        if not rows :
+            return newMatrix
+        assert min( rows ) >= 0 and max( rows ) < numRows and min( cols ) >= 0 and max( cols ) < numCols, "Array subscripts out of range."
+
+        # The entries are grouped by row in a single pass, so no per-entry bounds checks or zero tests are needed.
+        newRows = newMatrix._rows
+        for row, col, value in zip( rows, cols, values ):
+            rowDict = newRows.get( row )
+            if rowDict is None :
+                newRows[row] = { col : value }
+            elif col in rowDict :
+                rowDict[col] += value
+            else :
+                rowDict[col] = value
+
+        for row in [row for row, rowDict in newRows.items() if 0 in rowDict.values()] :
+            rowDict = { col : value for col, value in newRows[row].items() if value != 0 }
+            if rowDict :
+                newRows[row] = rowDict
+            else :
+                del newRows[row]
+        return newMatrix
+
+    # Return the transpose of the matrix as a new matrix, in O(nnz).
+    def transpose( self ):
+        newMatrix = SparseMatrix( self._numCols, self._numRows )
+        newRows = newMatrix._rows
+        for row, rowDict in self._rows.items() :
+            for col, value in rowDict.items() :
+                colDict = newRows.get( col )
+                if colDict is None :
+                    newRows[col] = { row : value }
+                else :
+                    colDict[row] = value
+        return newMatrix
+
+    # Return row i as a new 1 x numCols() matrix.
+    def row( self, i ):
+        assert i >= 0 and i < self._numRows, "Array subscripts out of range."
+        return self.submatrix( i, i + 1, 0, self._numCols )
+
+    # Return column j as a new numRows() x 1 matrix.
+    def col( self, j ):
+        assert j >= 0 and j < self._numCols, "Array subscripts out of range."
+        return self.submatrix( 0, self._numRows, j, j + 1 )
+
+    # Return the elements of rows rowStart to rowEnd - 1 and columns colStart to colEnd - 1 as a new matrix.
+    # Each dimension is walked over its range or over the stored elements, whichever is shorter.
+    def submatrix( self, rowStart, rowEnd, colStart, colEnd ):
+        assert 0 <= rowStart <= rowEnd <= self._numRows and 0 <= colStart <= colEnd <= self._numCols, "Array subscripts out of range."
+        newMatrix = SparseMatrix( rowEnd - rowStart, colEnd - colStart )
+        newRows = newMatrix._rows
+        rows = self._rows
+        if rowEnd - rowStart < len( rows ) :
+            selected = [(row, rows[row]) for row in range( rowStart, rowEnd ) if row in rows]
+        else :
+            selected = [(row, rowDict) for row, rowDict in rows.items() if rowStart <= row < rowEnd]
+
+        fullWidth = colStart == 0 and colEnd == self._numCols
+        for row, rowDict in selected :
+            if fullWidth :
+                newRow = rowDict.copy()
+            elif colEnd - colStart < len( rowDict ) :
+                newRow = { col - colStart : rowDict[col] for col in range( colStart, colEnd ) if col in rowDict }
+            else :
+                newRow = { col - colStart : value for col, value in rowDict.items() if colStart <= col < colEnd }
+            if newRow :
+                newRows[row - rowStart] = newRow
+        return newMatrix
+
+    # Helper method used to add or subtract two matrices of the same size in one pass over both operands, O(nnz_A + nnz_B).
+    # Each row of the result starts as a copy of the row of self and the row of rhsMatrix is merged into it; elements that
+    # cancel out are dropped as they are produced.
+    def _combine( self, rhsMatrix, op ):
+        newMatrix = SparseMatrix( self.numRows(), self.numCols() )
+        newRows = newMatrix._rows
+        for row, rowDict in self._rows.items() :
+            newRows[row] = rowDict.copy()
+        for row, rhsRow in rhsMatrix._rows.items() :
+            newRow = newRows.get( row )
+            if newRow is None :
+                newRows[row] = { col : op( 0, value ) for col, value in rhsRow.items() }
+                continue
+            for col, value in rhsRow.items() :
+                result = op( newRow.get( col, 0 ), value )
+                if result != 0 :
+                    newRow[col] = result
+                else :
+                    newRow.pop( col, None )
+            if not newRow :
+                del newRows[row]
+        return newMatrix
+
+    # Helper method used to traverse the non-zero elements as (row, col, value) tuples.
+    def _entries( self ):
+        for row, rowDict in self._rows.items() :
+            for col, value in rowDict.items() :
+                yield row, col, value
 
 
 # Exception class used for signalling invalid matrix dimensions.
@@ -149,6 +294,278 @@ class MatrixSizeError( Exception ):
         self.value = value
 
 
+# Frozen compressed storage shared by the CSR and CSC formats. The elements of major index i (a row for CSR, a column for CSC) are stored
+# at positions indptr[i] to indptr[i + 1] - 1 of the indices (the minor indices, in increasing order) and data arrays.
+class _CompressedMatrix :
+    def __init__( self, numRows, numCols, indptr, indices, data ):
+        self._numRows = numRows
+        self._numCols = numCols
+        self._indptr = indptr
+        self._indices = indices
+        self._data = data
+
+    # Return the number of rows in the matrix.
+    def numRows( self ):
+        return self._numRows
+
+    # Return the number of columns in the matrix.
+    def numCols( self ):
+        return self._numCols
+
+    # Return the number of non-zero elements stored in the matrix.
+    def numNonZeros( self ):
+        return len( self._indices )
+
+    # Return the index pointer array: the elements of major index i start at indptr()[i].
+    def indptr( self ):
+        return self._indptr
+
+    # Return the minor index of each stored element.
+    def indices( self ):
+        return self._indices
+
+    # Return the value of each stored element.
+    def data( self ):
+        return self._data
+
+    # Return the value of element (i, j), found by binary search within its row or column.
+    def __getitem__( self, ndxTuple ):
+        assert len(ndxTuple) == 2, "Invalid number of array subscripts."
+        row = ndxTuple[0]
+        col = ndxTuple[1]
+        assert row >= 0 and row < self.numRows() and col >= 0 and col < self.numCols(), "Array subscripts out of range."
+        major, minor = self._majorMinor( row, col )
+        start = self._indptr[major]
+        end = self._indptr[major + 1]
+        pos = bisect_left( self._indices, minor, start, end )
+        if pos < end and self._indices[pos] == minor :
+            return self._data[pos]
+        return 0
+
+    # Create a frozen matrix from the coordinate (COO) format: the element k is at (rows[k], cols[k]) and has the value values[k].
+    # The coordinates may come in any order; the values of repeated coordinates are summed, and zeros are not stored. Sorting is done
+    # with counting sorts in O(nnz + numRows + numCols).
+    @classmethod
+    def from_coo( cls, numRows, numCols, rows, cols, values ):
+        assert len( rows ) == len( cols ) == len( values ), "The coordinate arrays must have the same length."
+        if cls is CSRMatrix :
+            return cls( numRows, numCols, *_cooToCompressed( numRows, numCols, rows, cols, values ) )
+        else :
+            return cls( numRows, numCols, *_cooToCompressed( numCols, numRows, cols, rows, values ) )
+
+    def __eq__( self, rhsMatrix ):
+        return self.equals( rhsMatrix )
+
+    def __ne__( self, rhsMatrix ):
+        return not self.equals( rhsMatrix )
+
+    # Return True if the matrix has the same size and elements as rhsMatrix, with the elements differing by at most tol. Two matrices
+    # in the same format are first compared array by array; otherwise, or if they differ, the stored elements are compared.
+    def equals( self, rhsMatrix, tol = 0 ):
+        if self.numRows() != rhsMatrix.numRows() or self.numCols() != rhsMatrix.numCols():
+            return False
+        if type( rhsMatrix ) is type( self ) and tol == 0 and self._indptr == rhsMatrix._indptr and \
+           self._indices == rhsMatrix._indices and self._data == rhsMatrix._data :
+            return True
+        # Explicitly stored zeros make arrays differ without the matrices differing.
+        return self.to_sparse().equals( rhsMatrix, tol )
+
+    # Return a modifiable SparseMatrix holding the same elements.
+    def to_sparse( self ):
+        newMatrix = SparseMatrix( self._numRows, self._numCols )
+        for row, col, value in self._entries():
+            newMatrix[row, col] = value
+        return newMatrix
+
+    # Helper method used to traverse the non-zero elements as (row, col, value) tuples.
+    def _entries( self ):
+        indptr = self._indptr
+        for major in range( len( indptr ) - 1 ):
+            for pos in range( indptr[major], indptr[major + 1] ):
+                row, col = self._majorMinor( major, self._indices[pos] )
+                yield row, col, self._data[pos]
+
+
+# A sparse matrix frozen in compressed sparse row format.
+class CSRMatrix( _CompressedMatrix ):
+    def to_csr( self ):
+        return self
+
+    def to_csc( self ):
+        return CSCMatrix( self._numRows, self._numCols, *_transpose( self._numCols, self._indptr, self._indices, self._data ) )
+
+    # Return the transpose as a CSC matrix sharing the same arrays: the rows of this matrix are the columns of its transpose.
+    def transpose( self ):
+        return CSCMatrix( self._numCols, self._numRows, self._indptr, self._indices, self._data )
+
+    # Multiply the matrix by a vector given as a sequence of numCols() values: y = A @ x. Each row is a dot product over
+    # contiguous slices of the indices and data arrays. Returns the list of numRows() values.
+    def __matmul__( self, vector ):
+        if len( vector ) != self._numCols :
+            raise MatrixSizeError( "Vector size not compatible for the operation." )
+        indptr = self._indptr
+        indices = self._indices
+        data = self._data
+        getValue = vector.__getitem__
+        result = [0] * self._numRows
+        start = indptr[0]
+        for row in range( self._numRows ):
+            end = indptr[row + 1]
+            if end > start :
+                result[row] = sum( map( operator.mul, data[start:end], map( getValue, indices[start:end] ) ) )
+            start = end
+        return result
+
+    def _majorMinor( self, row, col ):
+        return row, col
+
+
+# A sparse matrix frozen in compressed sparse column format.
+class CSCMatrix( _CompressedMatrix ):
+    def to_csr( self ):
+        return CSRMatrix( self._numRows, self._numCols, *_transpose( self._numRows, self._indptr, self._indices, self._data ) )
+
+    def to_csc( self ):
+        return self
+
+    # Return the transpose as a CSR matrix sharing the same arrays: the columns of this matrix are the rows of its transpose.
+    def transpose( self ):
+        return CSRMatrix( self._numCols, self._numRows, self._indptr, self._indices, self._data )
+
+    # Multiply the matrix by a vector given as a sequence of numCols() values: y = A @ x. Each column is scaled by its vector
+    # element and scattered into the result. Returns the list of numRows() values.
+    def __matmul__( self, vector ):
+        if len( vector ) != self._numCols :
+            raise MatrixSizeError( "Vector size not compatible for the operation." )
+        indptr = self._indptr
+        indices = self._indices
+        data = self._data
+        result = [0] * self._numRows
+        for col in range( self._numCols ):
+            x = vector[col]
+            if x :
+                for pos in range( indptr[col], indptr[col + 1] ):
+                    result[indices[pos]] += data[pos] * x
+        return result
+
+    # The major index of a CSC matrix is the column.
+    def _majorMinor( self, major, minor ):
+        return minor, major
+
+
+# Builds the compressed (indptr, indices, data) arrays from a dictionary mapping each major index to a dictionary of minor indices and values.
+def _compress( numMajor, majorDicts ):
+    indptr = array( 'q', [0] ) * (numMajor + 1)
+    indices = array( 'q' )
+    values = list()
+    count = 0
+    for major in range( numMajor ):
+        minorDict = majorDicts.get( major )
+        if minorDict :
+            for minor in sorted( minorDict ):
+                indices.append( minor )
+                values.append( minorDict[minor] )
+            count += len( minorDict )
+        indptr[major + 1] = count
+    return indptr, indices, _dataArray( values )
+
+# Converts the compressed arrays of one format into the other with a counting sort over the minor indices, in O(nnz + numMinor).
+def _transpose( numMinor, indptr, indices, data ):
+    newIndptr = array( 'q', [0] ) * (numMinor + 1)
+    for minor in indices :
+        newIndptr[minor + 1] += 1
+    for i in range( numMinor ):
+        newIndptr[i + 1] += newIndptr[i]
+
+    nextPos = array( 'q', newIndptr )
+    newIndices = array( 'q', [0] ) * len( indices )
+    newData = list( data )
+    for major in range( len( indptr ) - 1 ):
+        for pos in range( indptr[major], indptr[major + 1] ):
+            minor = indices[pos]
+            dest = nextPos[minor]
+            newIndices[dest] = major
+            newData[dest] = data[pos]
+            nextPos[minor] = dest + 1
+    return newIndptr, newIndices, _dataArray( newData )
+
+# Builds the compressed (indptr, indices, data) arrays from coordinate arrays. The elements are sorted by minor index and then, stably, by major
+# index (a two-pass radix sort), so the minor indices come out in increasing order within each major index.
+def _cooToCompressed( numMajor, numMinor, majors, minors, values ):
+    order = _countingOrder( numMinor, minors, range( len( minors ) ) )
+    order = _countingOrder( numMajor, majors, order )
+
+    indptr = array( 'q', [0] ) * (numMajor + 1)
+    for major in majors :
+        indptr[major + 1] += 1
+    for i in range( numMajor ):
+        indptr[i + 1] += indptr[i]
+    indices = array( 'q', map( minors.__getitem__, order ) )
+    data = list( map( values.__getitem__, order ) )
+    if 0 in data or _hasDuplicates( indptr, indices ) :
+        indices, data = _sumDuplicates( indptr, indices, data )
+    return indptr, indices, _dataArray( data )
+
+# Returns True if a minor index is repeated within a major index of sorted compressed arrays, in which case the repeats are adjacent.
+def _hasDuplicates( indptr, indices ):
+    for major in range( len( indptr ) - 1 ):
+        for pos in range( indptr[major] + 1, indptr[major + 1] ):
+            if indices[pos] == indices[pos - 1] :
+                return True
+    return False
+
+# Merges the runs of equal minor indices within each major index of sorted compressed arrays, summing their values. Elements whose
+# value or sum is zero are dropped. The counts in indptr are updated in place; returns the new indices and data.
+def _sumDuplicates( indptr, indices, data ):
+    newIndices = array( 'q' )
+    newData = list()
+    start = indptr[0]
+    for major in range( len( indptr ) - 1 ):
+        end = indptr[major + 1]
+        for pos in range( start, end ):
+            if pos > start and indices[pos] == indices[pos - 1] :
+                newData[-1] += data[pos]
+            else :
+                _dropZero( newIndices, newData )
+                newIndices.append( indices[pos] )
+                newData.append( data[pos] )
+        _dropZero( newIndices, newData )
+        start = end
+        indptr[major + 1] = len( newIndices )
+    return newIndices, newData
+
+# Removes the last element merged by _sumDuplicates if its value is zero. The elements before it are already known to be non-zero.
+def _dropZero( indices, data ):
+    if data and data[-1] == 0 :
+        indices.pop()
+        data.pop()
+
+# Returns the positions listed in order, stably sorted by their key in keys, using a counting sort over the numKeys possible keys.
+def _countingOrder( numKeys, keys, order ):
+    starts = array( 'q', [0] ) * (numKeys + 1)
+    for key in keys :
+        assert key >= 0 and key < numKeys, "Array subscripts out of range."
+        starts[key + 1] += 1
+    for i in range( numKeys ):
+        starts[i + 1] += starts[i]
+    result = array( 'q', [0] ) * len( keys )
+    for pos in order :
+        key = keys[pos]
+        result[starts[key]] = pos
+        starts[key] += 1
+    return result
+
+# Stores the values in a typed array when they are all integers ('q') or all real numbers ('d'), and in a list otherwise.
+def _dataArray( values ):
+    if all( type( value ) is int for value in values ) :
+        try :
+            return array( 'q', values )
+        except OverflowError :
+            return values
+    if all( type( value ) is int or type( value ) is float for value in values ) :
+        return array( 'd', values )
+    return values
+
 def display_matrix(matrix):
     """Displays the matrix."""
     for i in range(matrix.numRows()):
@@ -0,0 +1,169 @@
+# Iterative solvers for the sparse linear system A x = b, where A is a square SparseMatrix, CSRMatrix or CSCMatrix. The matrix is frozen
+# into CSR format once and every iteration works on its typed arrays, using the CSR matrix-vector product for the residuals.
+
+# conjugateGradient( A, b, x0, tol, maxIter, preconditioner ): Conjugate gradient method for symmetric positive definite matrices. With
+# preconditioner set to True, the diagonal of A is used as a (Jacobi) preconditioner.
+
+# jacobi( A, b, x0, tol, maxIter ): Jacobi method; converges for strictly diagonally dominant matrices.
+
+# gaussSeidel( A, b, x0, tol, maxIter ): Gauss-Seidel method, sweeping the rows in place; converges for diagonally dominant and for
+# symmetric positive definite matrices.
+
+# Each solver stops once the residual norm |b - A x| is at most tol * |b|, or after maxIter iterations (default: 10 * number of rows), and
+# returns a SolverResult.
+
+import math
+import operator
+import time
+from bisect import bisect_left
+
+from SparseMatrix import MatrixSizeError
+
+# Default relative tolerance of the solvers.
+DEFAULT_TOL = 1e-8
+
+class SolverResult :
+    """
+    The outcome of an iterative solve.
+
+    Attributes:
+        x (list): The approximate solution.
+        converged (bool): True if the tolerance was reached.
+        iterations (int): The number of iterations performed.
+        residuals (list): The residual norm before the first iteration and after each iteration.
+        seconds (float): The time spent iterating.
+    """
+    def __init__( self, x, converged, iterations, residuals, seconds ):
+        self.x = x
+        self.converged = converged
+        self.iterations = iterations
+        self.residuals = residuals
+        self.seconds = seconds
+
+    # Return the number of iterations performed per second.
+    def iterationsPerSecond( self ):
+        return self.iterations / self.seconds if self.seconds > 0 else float( 'inf' )
+
+    def __repr__( self ):
+        return "SolverResult(converged=%s, iterations=%d, residual=%g, %.1f it/s)" % \
+               (self.converged, self.iterations, self.residuals[-1], self.iterationsPerSecond())
+
+# Solves A x = b with the (optionally preconditioned) conjugate gradient method.
+def conjugateGradient( A, b, x0 = None, tol = DEFAULT_TOL, maxIter = None, preconditioner = False ):
+    csr, x, maxIter, bNorm = _setup( A, b, x0, maxIter )
+    start = time.perf_counter()
+    r = _residual( csr, b, x )
+    residuals = [_norm( r )]
+    if preconditioner :
+        inverseDiag = [1.0 / d for d in _diagonal( csr )]
+        z = list( map( operator.mul, inverseDiag, r ) )
+    else :
+        z = r
+    p = list( z )
+    rz = _dot( r, z )
+
+    iterations = 0
+    while residuals[-1] > tol * bNorm and iterations < maxIter :
+        Ap = csr @ p
+        alpha = rz / _dot( p, Ap )
+        x = [xi + alpha * pi for xi, pi in zip( x, p )]
+        r = [ri - alpha * api for ri, api in zip( r, Ap )]
+        iterations += 1
+        residuals.append( _norm( r ) )
+        z = list( map( operator.mul, inverseDiag, r ) ) if preconditioner else r
+        rzNew = _dot( r, z )
+        beta = rzNew / rz
+        rz = rzNew
+        p = [zi + beta * pi for zi, pi in zip( z, p )]
+    return SolverResult( x, residuals[-1] <= tol * bNorm, iterations, residuals, time.perf_counter() - start )
+
+# Solves A x = b with the Jacobi method: x' = x + D^-1 (b - A x).
+def jacobi( A, b, x0 = None, tol = DEFAULT_TOL, maxIter = None ):
+    csr, x, maxIter, bNorm = _setup( A, b, x0, maxIter )
+    start = time.perf_counter()
+    inverseDiag = [1.0 / d for d in _diagonal( csr )]
+    r = _residual( csr, b, x )
+    residuals = [_norm( r )]
+
+    iterations = 0
+    while residuals[-1] > tol * bNorm and iterations < maxIter :
+        x = [xi + di * ri for xi, di, ri in zip( x, inverseDiag, r )]
+        r = _residual( csr, b, x )
+        iterations += 1
+        residuals.append( _norm( r ) )
+    return SolverResult( x, residuals[-1] <= tol * bNorm, iterations, residuals, time.perf_counter() - start )
+
+# Solves A x = b with the Gauss-Seidel method, updating each element of x in place as the rows are swept.
+def gaussSeidel( A, b, x0 = None, tol = DEFAULT_TOL, maxIter = None ):
+    csr, x, maxIter, bNorm = _setup( A, b, x0, maxIter )
+    start = time.perf_counter()
+    diag = _diagonal( csr )
+    indptr = csr.indptr()
+    indices = csr.indices()
+    data = csr.data()
+    getValue = x.__getitem__
+    residuals = [_norm( _residual( csr, b, x ) )]
+
+    iterations = 0
+    while residuals[-1] > tol * bNorm and iterations < maxIter :
+        for row in range( csr.numRows() ):
+            rowStart = indptr[row]
+            rowEnd = indptr[row + 1]
+            # The row product includes the diagonal term, so it is corrected rather than excluded.
+            rowSum = sum( map( operator.mul, data[rowStart:rowEnd], map( getValue, indices[rowStart:rowEnd] ) ) )
+            x[row] += (b[row] - rowSum) / diag[row]
+        iterations += 1
+        residuals.append( _norm( _residual( csr, b, x ) ) )
+    return SolverResult( x, residuals[-1] <= tol * bNorm, iterations, residuals, time.perf_counter() - start )
+
+# Validates the system and returns the CSR matrix, the starting vector, the iteration cap and the norm of b.
+def _setup( A, b, x0, maxIter ):
+    if A.numRows() != A.numCols() or len( b ) != A.numRows() or (x0 is not None and len( x0 ) != A.numCols()) :
+        raise MatrixSizeError( "Matrix and vector sizes not compatible for the operation." )
+    x = [0.0] * A.numCols() if x0 is None else [float( value ) for value in x0]
+    if maxIter is None :
+        maxIter = 10 * A.numRows()
+    bNorm = _norm( b )
+    # A zero right-hand side is solved by x = 0; any non-zero residual is then measured in absolute terms.
+    return A.to_csr(), x, maxIter, bNorm if bNorm > 0 else 1.0
+
+# Returns the diagonal of the CSR matrix, which must not contain zeros.
+def _diagonal( csr ):
+    indptr = csr.indptr()
+    indices = csr.indices()
+    data = csr.data()
+    diag = list()
+    for row in range( csr.numRows() ):
+        pos = bisect_left( indices, row, indptr[row], indptr[row + 1] )
+        assert pos < indptr[row + 1] and indices[pos] == row and data[pos] != 0, "The diagonal of the matrix must be non-zero."
+        diag.append( data[pos] )
+    return diag
+
+# Returns the residual b - A x.
+def _residual( csr, b, x ):
+    return list( map( operator.sub, b, csr @ x ) )
+
+def _dot( u, v ):
+    return sum( map( operator.mul, u, v ) )
+
+def _norm( v ):
+    return math.sqrt( _dot( v, v ) )
+
+if __name__ == '__main__':
+    from SparseMatrix import SparseMatrix
+
+    # A symmetric, strictly diagonally dominant tridiagonal matrix, for which all three methods converge.
+    n = 200
+    A = SparseMatrix( n, n )
+    for i in range( n ):
+        A[i, i] = 4
+        if i > 0 :
+            A[i, i - 1] = -1
+        if i < n - 1 :
+            A[i, i + 1] = -1
+    b = [1.0] * n
+
+    print( "CG:           ", conjugateGradient( A, b ) )
+    print( "PCG:          ", conjugateGradient( A, b, preconditioner = True ) )
+    print( "Jacobi:       ", jacobi( A, b ) )
+    print( "Gauss-Seidel: ", gaussSeidel( A, b ) )